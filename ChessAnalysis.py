@@ -0,0 +1,157 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Background analysis for ChessVar. Includes class AnalysisController, which runs the engine's iterative
+#     deepening in a worker thread on a private copy of a game, so a player on a clock can have the best move found
+#     so far at a deadline, stop a search early, watch each depth as it completes, and keep searching on the
+#     opponent's time (pondering). For example:
+#         controller = AnalysisController(game)
+#         result = controller.think(2.0, on_iteration=print_depth)  # Returns within about two seconds.
+#         game.make_move(*result.get_move())
+#         controller.make_move(*result.get_move())
+#         controller.ponder()  # Searches on while the opponent decides.
+#         controller.make_move(opponent_from, opponent_to)  # Keeps the pondering if it guessed this move.
+
+import threading
+
+from ChessEngine import MAX_PLY, Engine, TranspositionTable
+from ChessVar import SQUARE_NAMES
+
+
+class AnalysisController:
+    """Represents an analysis session following one game. The controller keeps its own copy of the game, moved on
+    through make_move, and searches a copy of that copy in a background thread, one search at a time. Every search
+    shares one transposition table, so the work of earlier searches, pondering included, speeds up later ones.
+
+    Pondering: once the controller's side has moved, ponder guesses the opponent's reply and searches the position
+    after it. If make_move then brings the guessed reply, the running search carries on as the search for the next
+    move, keeping the depths it has completed; any other move stops and discards it."""
+
+    def __init__(self, game, table_size=1 << 18, tablebase=None):
+        self._game = game._copy()
+        self._table = TranspositionTable(table_size)
+        self._tablebase = tablebase
+        self._engine = None  # Engine of the current or last search.
+        self._thread = None  # Thread of the current or last search.
+        self._result = None  # SearchResult of the deepest iteration the current search has completed, or None.
+        self._final = None  # SearchResult the last search returned, or None while it runs.
+        self._on_iteration = None  # Callback for completed iterations of the current search, or None.
+        self._depth_limit = None  # Depth at which the current search stops, or None.
+        self._ponder_move = None  # Opponent move the current search assumes, as a pair of algebraic squares, or None.
+        self._expected_line = []  # Rest of the last search's principal variation, for guessing the reply to ponder.
+
+    def get_position(self):
+        """Returns the get_position string of the controller's copy of the game."""
+        return self._game.get_position()
+
+    def get_result(self):
+        """Returns the SearchResult of the deepest iteration completed so far by the current or last search, or None
+        if it has not completed one. While pondering, this is for the position after the guessed reply."""
+        return self._final if self._final is not None else self._result
+
+    def get_ponder_move(self):
+        """Returns the opponent move being pondered on as a pair of algebraic squares, or None if not pondering."""
+        return self._ponder_move
+
+    def is_searching(self):
+        """Returns True while a search, pondering included, is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, depth=None, on_iteration=None):
+        """Starts searching the current position in the background, stopping any search already running. Searches
+        until stop is called, or until depth plies if given. on_iteration, if given, is called from the search thread
+        with a SearchResult after each completed depth."""
+        self.stop()
+        self._start(self._game._copy(), depth, on_iteration)
+
+    def stop(self):
+        """Stops the running search, if any, waits for it to finish, and returns its SearchResult: the best move of
+        the deepest completed depth, or the best-ordered move if none completed. Returns the last search's result if
+        none is running, or None if there has never been one."""
+        if self._thread is not None:
+            self._engine.stop()
+            self._thread.join()
+            self._thread = None
+            if self._ponder_move is None and self._final is not None:
+                self._expected_line = self._final.get_principal_variation()[1:]
+            self._ponder_move = None
+        return self._final
+
+    def think(self, time_limit, depth=None, on_iteration=None):
+        """Searches the current position for up to time_limit seconds, or until depth plies if given, and returns the
+        SearchResult of the deepest completed depth. Returns soon after the time is up even if a depth is under way.
+        If pondering guessed the last move right, the ponder search is continued rather than restarted."""
+        if self._thread is None or self._ponder_move is not None:
+            self.start(depth, on_iteration)
+        else:
+            self._on_iteration = on_iteration
+            self._depth_limit = depth
+            result = self._result
+            if depth is not None and result is not None and result.get_depth() >= depth:
+                self._engine.stop()
+        self._thread.join(time_limit)
+        return self.stop()
+
+    def make_move(self, move_from, move_to):
+        """Plays a move on the controller's copy of the game, as make_move would. If the move is the one being
+        pondered on, the ponder search carries on as a search of the new position; otherwise any running search is
+        stopped. Returns False, changing nothing, if the move is illegal."""
+        if not self._game.make_move(move_from, move_to):
+            return False
+        if self._ponder_move is not None and self._ponder_move == (move_from, move_to):
+            self._ponder_move = None
+        else:
+            self.stop()
+            if self._expected_line and self._expected_line[0] == (move_from, move_to):
+                self._expected_line = self._expected_line[1:]
+            else:
+                self._expected_line = []
+        return True
+
+    def ponder(self, move=None):
+        """Starts searching, in the background, the position after the opponent plays move, by default the reply the
+        last search expected, or failing that the best move stored for the position. Returns the move pondered on as
+        a pair of algebraic squares, or None, starting nothing, if there is no guess or the game is over."""
+        self.stop()
+        if move is None:
+            if self._expected_line:
+                move = self._expected_line[0]
+            else:
+                entry = self._table.probe(self._game.get_hash())
+                if entry is not None and entry[4] is not None:
+                    move = (SQUARE_NAMES[entry[4][0]], SQUARE_NAMES[entry[4][1]])
+        if move is None or self._game.get_game_state() != 'UNFINISHED':
+            return None
+        game = self._game._copy()
+        if not game.make_move(*move):
+            return None
+        self._start(game, None, None)
+        self._ponder_move = tuple(move)
+        return self._ponder_move
+
+    def close(self):
+        """Stops any running search."""
+        self.stop()
+
+    def _start(self, game, depth, on_iteration):
+        """Starts a background search of game, which it takes over."""
+        self._engine = Engine(self._table, tablebase=self._tablebase)
+        self._result = None
+        self._final = None
+        self._on_iteration = on_iteration
+        self._depth_limit = depth
+        self._thread = threading.Thread(target=self._run, args=(self._engine, game), daemon=True)
+        self._thread.start()
+
+    def _run(self, engine, game):
+        """Search thread body. The engine deepens until stopped; _record applies the depth limit, which may be
+        changed while it runs."""
+        self._final = engine.search(game, MAX_PLY, None, self._record)
+
+    def _record(self, result):
+        """Takes a completed iteration from the search thread."""
+        self._result = result
+        if self._on_iteration is not None:
+            self._on_iteration(result)
+        if self._depth_limit is not None and result.get_depth() >= self._depth_limit:
+            self._engine.stop()
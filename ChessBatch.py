@@ -0,0 +1,233 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Batched ChessVar boards on NumPy arrays, for stepping thousands of independent games at once in
+#     Monte-Carlo evaluation and dataset generation. Includes class BatchBoards, which computes legal move masks,
+#     applies one move per board, and detects wins for every board with whole-array operations. Follows exactly the same
+#     rules as ChessVar.make_move. Requires NumPy, which the rest of the project does not.
+
+import numpy as np
+
+from ChessVar import BISHOP, BLACK, KING, KNIGHT, PAWN, PIECE_NAMES, QUEEN, ROOK, WHITE
+
+# Piece codes in the grid: 0 is an empty square, 1-6 are white pieces and 7-12 black pieces in PIECE_NAMES order, so
+# code = 1 + 6 * color + type, with the side and type numbers of ChessVar.PIECE_CODES.
+EMPTY = 0
+
+# Game states, matching ChessVar's 'UNFINISHED', 'WHITE_WON', and 'BLACK_WON'.
+UNFINISHED, WHITE_WON, BLACK_WON = 0, 1, 2
+STATE_NAMES = ('UNFINISHED', 'WHITE_WON', 'BLACK_WON')
+
+
+def _step_pairs(rank_step, file_step, from_ranks=range(8)):
+    """Returns (sources, targets, flat) arrays for a single (rank, file) step: every square on from_ranks the step
+    stays on the board from, the square it lands on, and the flattened from * 64 + to index of the move. Sources are
+    in ascending order."""
+    sources = []
+    for square in range(64):
+        rank, file = divmod(square, 8)
+        if rank in from_ranks and 0 <= rank + rank_step <= 7 and 0 <= file + file_step <= 7:
+            sources.append(square)
+    sources = np.array(sources, dtype=np.intp)
+    targets = sources + 8 * rank_step + file_step
+    return sources, targets, sources * 64 + targets
+
+
+def _ray_pairs(rank_step, file_step):
+    """Returns the step pairs for distances 1 to 7 along one direction, dropping distances that leave the board from
+    every square. Each distance's sources are a subset of the previous distance's."""
+    pairs = []
+    for distance in range(1, 8):
+        sources, targets, flat = _step_pairs(rank_step * distance, file_step * distance)
+        if len(sources):
+            pairs.append((sources, targets, flat))
+    return pairs
+
+
+KING_PAIRS = [_step_pairs(*step) for step in ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (-1, 1), (1, -1), (-1, -1))]
+KNIGHT_PAIRS = [_step_pairs(*step) for step in ((1, 2), (-1, 2), (1, -2), (-1, -2), (2, 1), (-2, 1), (2, -1), (-2, -1))]
+ROOK_PAIRS = [_ray_pairs(*direction) for direction in ((0, 1), (0, -1), (1, 0), (-1, 0))]
+BISHOP_PAIRS = [_ray_pairs(*direction) for direction in ((1, 1), (-1, 1), (1, -1), (-1, -1))]
+# Indexed by color: (single push, double push from the start rank), and the two diagonal captures.
+PAWN_PUSH_PAIRS = ((_step_pairs(1, 0), _step_pairs(2, 0, (1,))), (_step_pairs(-1, 0), _step_pairs(-2, 0, (6,))))
+PAWN_CAPTURE_PAIRS = ((_step_pairs(1, 1), _step_pairs(1, -1)), (_step_pairs(-1, 1), _step_pairs(-1, -1)))
+
+START_GRID = np.zeros(64, dtype=np.int8)
+for _file, _type in enumerate((ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK)):
+    START_GRID[_file] = 1 + _type
+    START_GRID[8 + _file] = 1 + PAWN
+    START_GRID[48 + _file] = 7 + PAWN
+    START_GRID[56 + _file] = 7 + _type
+START_COUNTS = np.array([1, 1, 2, 2, 2, 8], dtype=np.int8)  # In PIECE_NAMES order.
+
+
+class BatchBoards:
+    """Represents a batch of independent ChessVar games stored as arrays: an (N, 64) int8 grid of piece codes, (N, 2, 6)
+    piece counts per color and type mirroring ChessVar's _white_pieces and _black_pieces, and per-board side to move,
+    turn, and game state. Squares are numbered as in ChessVar, a1 = 0 through h8 = 63."""
+
+    def __init__(self, count):
+        self._grid = np.tile(START_GRID, (count, 1))
+        self._counts = np.tile(START_COUNTS, (count, 2, 1))
+        self._side = np.zeros(count, dtype=np.int8)  # WHITE or BLACK to move.
+        self._turn = np.ones(count, dtype=np.int32)
+        self._state = np.zeros(count, dtype=np.int8)  # UNFINISHED, WHITE_WON, or BLACK_WON.
+
+    @classmethod
+    def from_games(cls, games):
+        """Returns a batch holding copies of the positions of a list of ChessVar games."""
+        batch = cls(len(games))
+        for index, game in enumerate(games):
+            for square, piece in enumerate(game._board):
+                batch._grid[index, square] = EMPTY if piece is None else \
+                    1 + 6 * (piece.get_color() == 'black') + PIECE_NAMES.index(piece.get_name())
+            for color, counts in ((WHITE, game._white_pieces), (BLACK, game._black_pieces)):
+                batch._counts[index, color] = [counts[name] for name in PIECE_NAMES]
+            batch._side[index] = WHITE if game._active_player == 'white' else BLACK
+            batch._turn[index] = game.get_turn()
+            batch._state[index] = STATE_NAMES.index(game.get_game_state())
+        return batch
+
+    def __len__(self):
+        return len(self._grid)
+
+    def get_grid(self):
+        """Returns the (N, 64) grid of piece codes."""
+        return self._grid
+
+    def get_counts(self):
+        """Returns the (N, 2, 6) piece counts, indexed by board, color, and type in PIECE_NAMES order."""
+        return self._counts
+
+    def get_side_to_move(self):
+        """Returns the (N,) array of WHITE or BLACK to move."""
+        return self._side
+
+    def get_turns(self):
+        """Returns the (N,) array of turn numbers, as ChessVar.get_turn."""
+        return self._turn
+
+    def get_states(self):
+        """Returns the (N,) array of UNFINISHED, WHITE_WON, or BLACK_WON."""
+        return self._state
+
+    def get_game_state(self, index):
+        """Returns one board's state as 'UNFINISHED', 'WHITE_WON', or 'BLACK_WON'."""
+        return STATE_NAMES[self._state[index]]
+
+    def legal_move_mask(self, boards=None):
+        """Returns an (N, 64, 64) boolean array that is True at [board, from, to] for every legal move of the side to
+        move. Finished boards have no legal moves. boards, an array of board indexes, limits the mask to those boards
+        and returns them in that order."""
+        moves = self._move_table(boards)
+        return moves.T.reshape(moves.shape[1], 64, 64)
+
+    def _move_table(self, boards=None):
+        """Returns the legal moves of boards as a (4096, N) boolean array indexed by [from * 64 + to, board]. Every
+        array here is square-major, so each table lookup below copies whole contiguous rows of boards."""
+        if boards is None:
+            boards = np.arange(len(self._grid))
+        grid = self._grid[boards].T
+        color = (grid - 1) // 6  # 0 white, 1 black; meaningless for empty squares.
+        occupied = grid != EMPTY
+        side = self._side[boards]
+        own = occupied & (color == side)
+        enemy = occupied & (color != side)
+        empty = ~occupied
+        open_target = ~own  # Empty or enemy.
+        piece_type = np.where(own & (self._state[boards] == UNFINISHED), (grid - 1) % 6, -1)
+        moves = np.zeros((4096, len(boards)), dtype=bool)
+
+        def add_steps(movers, pairs):
+            for sources, targets, flat in pairs:
+                moves[flat] |= movers[sources] & open_target[targets]
+
+        def add_rays(movers, rays):
+            for ray in rays:
+                alive = movers  # Sliders whose ray is still unblocked, by source square.
+                for sources, targets, flat in ray:
+                    moving = alive[sources]
+                    moves[flat] |= moving & open_target[targets]
+                    alive = np.zeros_like(movers)
+                    alive[sources] = moving & empty[targets]
+
+        add_steps(piece_type == KING, KING_PAIRS)
+        add_steps(piece_type == KNIGHT, KNIGHT_PAIRS)
+        add_rays((piece_type == ROOK) | (piece_type == QUEEN), ROOK_PAIRS)
+        add_rays((piece_type == BISHOP) | (piece_type == QUEEN), BISHOP_PAIRS)
+
+        # Pawns push onto empty squares, two on their first move, and capture diagonally onto enemy pieces.
+        pawns = piece_type == PAWN
+        for side_color in (WHITE, BLACK):
+            movers = pawns & (side == side_color)
+            (sources, targets, flat), (double_sources, double_targets, double_flat) = PAWN_PUSH_PAIRS[side_color]
+            single = movers[sources] & empty[targets]
+            moves[flat] |= single
+            on_start = single[np.searchsorted(sources, double_sources)]
+            moves[double_flat] |= on_start & empty[double_targets]
+            for sources, targets, flat in PAWN_CAPTURE_PAIRS[side_color]:
+                moves[flat] |= movers[sources] & enemy[targets]
+        return moves
+
+    def apply_moves(self, from_squares, to_squares):
+        """Plays one move on every board, from_squares[i] to to_squares[i], as ChessVar.make_move would, without
+        checking legality. Boards with a from square of -1, and finished boards, are left alone."""
+        from_squares = np.asarray(from_squares)
+        to_squares = np.asarray(to_squares)
+        boards = np.nonzero((from_squares >= 0) & (self._state == UNFINISHED))[0]
+        moving_from = from_squares[boards]
+        moving_to = to_squares[boards]
+        captured = self._grid[boards, moving_to].astype(np.intp)
+        self._grid[boards, moving_to] = self._grid[boards, moving_from]
+        self._grid[boards, moving_from] = EMPTY
+
+        # Captures reduce the opponent's count of that type; a count reaching zero wins for the mover.
+        capturing = captured != EMPTY
+        capture_boards = boards[capturing]
+        capture_color = (captured[capturing] - 1) // 6
+        capture_type = (captured[capturing] - 1) % 6
+        self._counts[capture_boards, capture_color, capture_type] -= 1
+        won = np.zeros(len(boards), dtype=bool)
+        won[capturing] = self._counts[capture_boards, capture_color, capture_type] == 0
+        self._state[boards[won]] = np.where(self._side[boards[won]] == WHITE, WHITE_WON, BLACK_WON)
+
+        # As in ChessVar, a winning move leaves side to move and turn as they were.
+        continuing = boards[~won]
+        self._turn[continuing] += self._side[continuing]
+        self._side[continuing] ^= 1
+
+    def random_moves(self, generator, boards=None):
+        """Returns (from_squares, to_squares) arrays with a uniformly random legal move for each board in boards (all
+        boards by default), using the NumPy generator given, and -1 for boards without a legal move."""
+        moves = self._move_table(boards).reshape(64, 64, -1)
+        count = moves.shape[2]
+        columns = np.arange(count)
+
+        # Pick the r-th legal move of each board: first the from square holding it, then the to square within that row.
+        per_from = moves.sum(axis=1, dtype=np.int32)
+        from_totals = per_from.cumsum(axis=0)
+        has_move = from_totals[-1] > 0
+        pick = (generator.random(count) * from_totals[-1]).astype(np.int32)
+        from_squares = np.minimum((from_totals <= pick).sum(axis=0), 63)
+        pick -= from_totals[from_squares, columns] - per_from[from_squares, columns]
+        row = moves[from_squares, :, columns].cumsum(axis=1, dtype=np.int32)
+        to_squares = np.minimum((row <= pick[:, None]).sum(axis=1), 63)
+        return np.where(has_move, from_squares, -1), np.where(has_move, to_squares, -1)
+
+    def play_random(self, generator, max_plies=400):
+        """Plays random moves on every board until each is finished, stuck, or max_plies plies have been played. Only
+        boards still being played are worked on, so the cost of each ply shrinks as games end."""
+        boards = np.arange(len(self._grid))
+        for _ in range(max_plies):
+            boards = boards[self._state[boards] == UNFINISHED]
+            if not len(boards):
+                break
+            from_squares, to_squares = self.random_moves(generator, boards)
+            stuck = from_squares < 0
+            if stuck.all():
+                break
+            moves_from = np.full(len(self._grid), -1)
+            moves_to = np.full(len(self._grid), -1)
+            moves_from[boards], moves_to[boards] = from_squares, to_squares
+            self.apply_moves(moves_from, moves_to)
+            boards = boards[~stuck]
@@ -0,0 +1,148 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Benchmark suite for ChessVar. Times each Piece subclass's move_range from fixed positions, make_move
+#     replaying recorded games, ChessVar() construction, and whole random-game playouts. Writes the results as JSON and
+#     compares them with the checked-in baseline in bench_baseline.json, flagging any benchmark that got slower by more
+#     than a threshold. Run as a script, e.g. "python ChessBench.py --output results.json", or
+#     "python ChessBench.py --update-baseline" after an intended change in speed.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from ChessVar import ChessVar, SQUARE_NAMES, set_range_cache_size
+from ChessPerft import PERFT_SUITE, position_from_moves
+from ChessTournament import play_game
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+RANDOM_PLAYER = {'type': 'random'}
+
+
+def bench_move_range(rounds=500):
+    """Returns {benchmark name: (operations, function)} timing move_range for each type of piece, called for every such
+    piece on the board in each PERFT_SUITE position."""
+    calls = {}  # {name: [(piece, location, occupied_squares)]}
+    for _, moves, _ in PERFT_SUITE:
+        game = position_from_moves(moves)
+        occupied_squares = {SQUARE_NAMES[square]: piece for square, piece in enumerate(game._board) if piece}
+        for location, piece in occupied_squares.items():
+            calls.setdefault(piece.get_name(), []).append((piece, location, occupied_squares))
+
+    def make_run(piece_calls):
+        def run():
+            for _ in range(rounds):
+                for piece, location, occupied_squares in piece_calls:
+                    piece.move_range(location, occupied_squares)
+        return run
+    return {'move_range_' + name: (rounds * len(piece_calls), make_run(piece_calls))
+            for name, piece_calls in sorted(calls.items())}
+
+
+def bench_make_move(games=50):
+    """Returns {benchmark name: (operations, function)} timing make_move replaying games seeded random games, recorded
+    once beforehand so only the replay is timed."""
+    recorded = [[(move[:2], move[2:]) for move in play_game(seed, RANDOM_PLAYER, RANDOM_PLAYER)['moves']]
+                for seed in range(games)]
+
+    def run():
+        for moves in recorded:
+            game = ChessVar()
+            for move_from, move_to in moves:
+                game.make_move(move_from, move_to)
+    return {'make_move_replay': (sum(len(moves) for moves in recorded), run)}
+
+
+def bench_construction(count=20000):
+    """Returns {benchmark name: (operations, function)} timing ChessVar()."""
+    def run():
+        for _ in range(count):
+            ChessVar()
+    return {'construction': (count, run)}
+
+
+def bench_playout(games=20):
+    """Returns {benchmark name: (operations, function)} timing whole seeded random games, move choice included."""
+    def run():
+        for seed in range(games):
+            play_game(seed, RANDOM_PLAYER, RANDOM_PLAYER)
+    return {'random_playout': (games, run)}
+
+
+def run_benchmarks(repeat=10):
+    """Runs every benchmark repeat times and returns {name: {'operations': n, 'seconds': s, 'ops_per_second': r}},
+    keeping each benchmark's fastest run, the one least disturbed by the rest of the machine. The runs are interleaved,
+    one of each benchmark per round, so that a slow spell on the machine does not fall on a single benchmark."""
+    benches = {}
+    for bench in (bench_move_range, bench_make_move, bench_construction, bench_playout):
+        benches.update(bench())
+    best = dict.fromkeys(benches, float('inf'))
+    for _ in range(repeat):
+        for name, (_, function) in benches.items():
+            start = time.perf_counter()
+            function()
+            best[name] = min(best[name], time.perf_counter() - start)
+    return {name: {'operations': operations, 'seconds': best[name], 'ops_per_second': operations / best[name]}
+            for name, (operations, _) in benches.items()}
+
+
+def compare(results, baseline, threshold):
+    """Returns {name: (baseline ops/s, change, regressed)} for every benchmark in both results and baseline, change
+    being the fractional change in speed and regressed whether it slowed by more than threshold."""
+    rows = {}
+    for name, result in results.items():
+        if name in baseline:
+            before = baseline[name]['ops_per_second']
+            change = result['ops_per_second'] / before - 1
+            rows[name] = (before, change, change < -threshold)
+    return rows
+
+
+def main(argv=None):
+    """Command line entry point. Returns 1 if any benchmark regressed beyond the threshold, otherwise 0."""
+    parser = argparse.ArgumentParser(description="Benchmark ChessVar and compare with a stored baseline.")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="baseline JSON file (default bench_baseline.json)")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="fractional slowdown reported as a regression (default 0.15)")
+    parser.add_argument('--repeat', type=int, default=10, help="runs of each benchmark; the fastest counts")
+    parser.add_argument('--range-cache', type=int, default=0, help="move_range cache size (default 0, off)")
+    parser.add_argument('--update-baseline', action='store_true', help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    set_range_cache_size(args.range_cache)
+    results = run_benchmarks(args.repeat)
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'benchmarks': results}
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+        print("baseline written to " + args.baseline, file=sys.stderr)
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)['benchmarks']
+    regressions = 0
+    rows = compare(results, baseline, args.threshold)
+    for name, result in sorted(results.items()):
+        line = f"{name:<22} {result['ops_per_second']:>14,.1f} ops/s"
+        if name in rows:
+            before, change, regressed = rows[name]
+            line += f"  baseline {before:>14,.1f}  {change:+7.1%}" + ("  REGRESSION" if regressed else "")
+            regressions += regressed
+        print(line)
+    if regressions:
+        print(str(regressions) + " benchmark(s) slower than baseline by more than " + f"{args.threshold:.0%}",
+              file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
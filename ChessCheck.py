@@ -0,0 +1,606 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Randomized cross-checks for ChessVar and the modules built on it. Each check plays seeded random games
+#     and compares, move by move, two independent ways of arriving at the same thing, such as ChessVar and a faster
+#     board that is meant to follow the same rules. Complements the fixed perft counts of ChessPerft. Checks whose
+#     modules need NumPy are skipped without it. Run as a script, e.g. "python ChessCheck.py --suite", or name checks,
+#     e.g. "python ChessCheck.py batch --games 200 --seed 7".
+
+import argparse
+import copy
+import importlib.util
+import json
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+
+from ChessVar import ChessVar, PIECE_CODES, PIECE_LETTERS, PIECE_NAMES, REJECTION_REASONS, SQUARE_INDEX, SQUARE_NAMES, \
+    iter_squares
+
+
+def check_batch(generator, games):
+    """ChessBatch.BatchBoards against ChessVar: plays games random games side by side on both, comparing legal moves,
+    piece codes, counts, side to move, turn, and state after every ply. Returns a list of failure descriptions."""
+    from ChessBatch import STATE_NAMES, BatchBoards  # Imported here because ChessBatch needs NumPy.
+    boards = BatchBoards(games)
+    scalar = [ChessVar() for _ in range(games)]
+    failures = []
+    ply = 0
+    while True:
+        masks = boards.legal_move_mask()
+        from_squares = [-1] * games
+        to_squares = [-1] * games
+        for index, game in enumerate(scalar):
+            expected = sorted(game._square_moves())
+            actual = sorted(zip(*(masks[index].nonzero())))
+            if [tuple(map(int, move)) for move in actual] != expected:
+                failures.append(f"game {index} ply {ply}: legal moves differ at {game.get_position()}")
+            counts = [game._white_pieces[name] for name in PIECE_NAMES] + \
+                [game._black_pieces[name] for name in PIECE_NAMES]
+            if list(boards.get_grid()[index]) != [PIECE_CODES[piece] for piece in game._board] or \
+                    list(boards.get_counts()[index].ravel()) != counts or \
+                    boards.get_side_to_move()[index] != (game._active_player == 'black') or \
+                    boards.get_turns()[index] != game.get_turn() or \
+                    STATE_NAMES[boards.get_states()[index]] != game.get_game_state():
+                failures.append(f"game {index} ply {ply}: position differs at {game.get_position()}")
+            if expected:
+                from_squares[index], to_squares[index] = generator.choice(expected)
+                game._make_square_move(from_squares[index], to_squares[index])
+        if failures or from_squares == [-1] * games:
+            return failures
+        boards.apply_moves(from_squares, to_squares)
+        ply += 1
+
+
+def _attack_errors(game):
+    """Returns a description of where game's incremental attack maps and counts differ from maps computed afresh from
+    the board, or where the moves found through them differ from those found from the bitboards alone, or None if
+    everything agrees."""
+    moves = game._square_moves()  # From the bitboards while the maps are stale.
+    if game._stale:
+        game._refresh_attacks()
+    if game._square_moves() != moves:
+        return "moves from attack maps"
+    occupancy = game._color_bitboards['white'] | game._color_bitboards['black']
+    counts = {'white': [0] * 64, 'black': [0] * 64}
+    for square, piece in enumerate(game._board):
+        attacks = 0 if piece is None else piece.attacks(square, occupancy)
+        if game._attacks[square] != attacks:
+            return "attack map of square " + str(square)
+        if piece is not None:
+            for target in iter_squares(attacks):
+                counts[piece.get_color()][target] += 1
+    for color in ('white', 'black'):
+        for square in range(64):
+            if game.attack_count(SQUARE_NAMES[square], color) != counts[color][square]:
+                return "attack count of square " + str(square)
+    sliders = sum(1 << square for square, piece in enumerate(game._board)
+                  if piece is not None and piece.get_name() in ('queen', 'bishop', 'rook'))
+    return None if sliders == game._sliders else "slider bitboard"
+
+
+def check_attacks(generator, games):
+    """ChessVar's incremental attack maps against maps computed afresh: plays games random games, taking back a random
+    number of moves now and then, and compares the maps, counts, and sliders at random points, so the maps are
+    brought up to date after anything from one change to several moves and take-backs. Returns a list of failure
+    descriptions."""
+    failures = []
+    for number in range(games):
+        game = ChessVar()
+        while game.get_game_state() == 'UNFINISHED' and len(game.get_moves()) < 300:
+            moves = game._square_moves()
+            if not moves:
+                break
+            game._make_square_move(*generator.choice(moves))
+            if generator.random() < 0.1:
+                for _ in range(generator.randint(1, 4)):
+                    game.unmake_move()
+            error = _attack_errors(game) if generator.random() < 0.3 else None
+            if error is not None:
+                failures.append(f"game {number}: {error} differs at {game.get_position()}")
+                break
+    return failures
+
+
+def check_instrumentation(generator, games):
+    """ChessVar's instrumentation counters and events against counts kept alongside: plays games random games of
+    make_move calls, legal and otherwise, and take-backs on an instrumented game and a plain one, working out what
+    each call should count from the plain game, then checks the counters, the events, that both games agree, and
+    that disabling leaves a plain game with no counters. Returns a list of failure descriptions."""
+    failures = []
+    for number in range(games):
+        game = ChessVar()
+        plain = ChessVar()
+        events = dict.fromkeys(('move', 'rejected', 'unmake', 'state'), 0)
+
+        def count(board, event, details):
+            events[event] += 1
+        game.enable_instrumentation(count)
+        expected = {'make_move_calls': 0, 'accepted': 0, 'rejected': dict.fromkeys(REJECTION_REASONS, 0),
+                    'range_calls': dict.fromkeys(PIECE_NAMES, 0), 'captures': dict.fromkeys(PIECE_NAMES, 0),
+                    'unmakes': 0}
+        expected_events = dict.fromkeys(events, 0)
+        found = len(failures)
+        for _ in range(generator.randint(20, 120)):
+            state = plain.get_game_state()
+            if generator.random() < 0.15:
+                if plain.unmake_move():
+                    if generator.random() < 0.5:
+                        game.unmake_move()
+                    else:
+                        game.pop()
+                    expected['unmakes'] += 1
+                    expected_events['unmake'] += 1
+                    expected_events['state'] += plain.get_game_state() != state
+                continue
+            moves = plain._square_moves()
+            if moves and generator.random() < 0.7:
+                from_square, to_square = generator.choice(moves)
+            else:
+                from_square, to_square = generator.randrange(64), generator.randrange(64)
+            piece = plain._board[from_square]
+            captured = plain._board[to_square]
+            expected['make_move_calls'] += 1
+            if state != 'UNFINISHED':
+                reason = 'game_over'
+            elif piece is None:
+                reason = 'empty_square'
+            elif piece.get_color() != plain._active_player:
+                reason = 'wrong_player'
+            else:
+                expected['range_calls'][piece.get_name()] += 1
+                reason = None if (from_square, to_square) in moves else 'out_of_range'
+            made = game.make_move(SQUARE_NAMES[from_square], SQUARE_NAMES[to_square])
+            if made != plain._make_square_move(from_square, to_square) or made != (reason is None):
+                failures.append(f"game {number}: make_move disagrees at {plain.get_position()}")
+                break
+            if reason is not None:
+                expected['rejected'][reason] += 1
+                expected_events['rejected'] += 1
+                continue
+            expected['accepted'] += 1
+            expected_events['move'] += 1
+            expected_events['state'] += plain.get_game_state() != state
+            if captured is not None:
+                expected['captures'][captured.get_name()] += 1
+        stats = game.get_stats()
+        del stats['make_move_seconds']
+        if len(failures) == found and \
+                (stats != expected or events != expected_events or _game_key(game) != _game_key(plain)):
+            failures.append(f"game {number}: counters or events differ at {plain.get_position()}")
+        game.disable_instrumentation()
+        game.legal_moves()
+        if game.get_stats() is not None or vars(game).keys() != vars(plain).keys():
+            failures.append(f"game {number}: still instrumented after disable_instrumentation")
+    return failures
+
+
+def check_range_cache(generator, games):
+    """Piece.move_range through the range cache against ranges worked out afresh from range_mask, as move_range does
+    with the cache off: plays games random games with a small cache on, asking at every ply for the range of each
+    piece twice, so lookups miss, hit, and evict. The cache is left as it was found. Returns a list of failure
+    descriptions."""
+    import ChessVar as chess_var  # The module, for its cache settings.
+    size = chess_var.get_range_cache_stats()['size']
+    failures = []
+    try:
+        chess_var.set_range_cache_size(-1)
+        failures.append("negative cache size accepted")
+    except ValueError:
+        pass
+    chess_var.set_range_cache_size(256)
+    try:
+        for number in range(games):
+            game = ChessVar()
+            found = len(failures)
+            while game.get_game_state() == 'UNFINISHED' and len(game.get_moves()) < 200:
+                occupied = {SQUARE_NAMES[square]: piece for square, piece in enumerate(game._board)
+                            if piece is not None}
+                for square in iter_squares(game._color_bitboards['white'] | game._color_bitboards['black']):
+                    piece = game._board[square]
+                    own = game._color_bitboards[piece.get_color()]
+                    enemy = game._color_bitboards['black' if piece.get_color() == 'white' else 'white']
+                    expected = {SQUARE_NAMES[target] for target in iter_squares(piece.range_mask(square, own, enemy))}
+                    if any(piece.move_range(SQUARE_NAMES[square], occupied) != expected for _ in range(2)):
+                        failures.append(f"game {number}: cached range of {SQUARE_NAMES[square]} differs at "
+                                        f"{game.get_position()}")
+                        break
+                moves = game._square_moves()
+                if len(failures) > found or not moves:
+                    break
+                game._make_square_move(*generator.choice(moves))
+        stats = chess_var.get_range_cache_stats()
+        if not (stats['hits'] and stats['misses'] and stats['evictions']):
+            failures.append(f"cache not exercised: {stats}")
+    finally:
+        chess_var.set_range_cache_size(size)
+    return failures
+
+
+def _long_game(generator, plies):
+    """Returns a ChessVar game of up to plies random moves, none of which ends the game, so games run long enough to
+    pass many history checkpoints."""
+    game = ChessVar()
+    while len(game.get_moves()) < plies:
+        moves = game._square_moves()
+        generator.shuffle(moves)
+        for from_square, to_square in moves:
+            game._make_square_move(from_square, to_square)
+            if game.get_game_state() == 'UNFINISHED':
+                break
+            game.unmake_move()
+        else:
+            break
+    return game
+
+
+def check_record(generator, games):
+    """ChessRecord files and position strings against the games they come from: plays games random games, checking at
+    every ply that from_position gives back get_position's position, writes them to a temporary record file, a third
+    each through write_game, write_moves, and a GameRecorder following the game as it is played, and reads them back,
+    comparing moves, results, and the positions of every ply. Returns a list of failure descriptions."""
+    from ChessRecord import GameRecordReader, GameRecordWriter
+    failures = []
+    played = []  # [(moves, result, [position string at each ply])]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'games.cvgr')
+        with GameRecordWriter(path) as writer:
+            for number in range(games):
+                game = ChessVar()
+                recorder = writer.record(game) if number % 3 == 2 else None
+                positions = [game.get_position()]
+                while game.get_game_state() == 'UNFINISHED' and len(positions) <= 300:
+                    moves = game._square_moves()
+                    if not moves:
+                        break
+                    from_square, to_square = generator.choice(moves)
+                    game.make_move(SQUARE_NAMES[from_square], SQUARE_NAMES[to_square])
+                    positions.append(game.get_position())
+                    restored = ChessVar.from_position(positions[-1])
+                    if restored.get_position() != positions[-1] or \
+                            restored.get_game_state() != game.get_game_state():
+                        failures.append(f"game {number}: position string does not round-trip: {positions[-1]}")
+                        break
+                if recorder is not None:
+                    recorder.finish()
+                elif number % 3 == 1:
+                    writer.write_moves(game.get_moves(), game.get_game_state())
+                else:
+                    writer.write_game(game)
+                played.append((game.get_moves(), game.get_game_state(), positions))
+        with GameRecordReader(path) as reader:
+            if len(reader) != games:
+                return failures + [f"record holds {len(reader)} games, not {games}"]
+            for number, (moves, result, positions) in enumerate(played):
+                if reader.get_moves(number) != moves or reader.get_result(number) != result:
+                    failures.append(f"game {number}: moves or result differ in the record")
+                    continue
+                for verify in (False, True):
+                    replayed = [game.get_position() for game in reader.positions(number, verify)]
+                    if replayed != positions or reader.replay(number, verify).get_game_state() != result:
+                        failures.append(f"game {number}: replay with verify={verify} differs")
+    return failures
+
+
+def check_dataset(generator, games):
+    """ChessDataset's feature arrays against the ChessVar boards they describe: plays games random games, writes them
+    both as a record file and as ChessTournament JSON lines, checks that read_games gives the same games from each,
+    and compares every row of the batches iter_batches makes of them, with and without mirroring, against planes,
+    side, counts, and result worked out from the board of that position. Batches are kept small so positions of one
+    game span several. Returns a list of failure descriptions."""
+    import numpy as np
+    from ChessDataset import iter_batches, read_games
+    from ChessRecord import GameRecordWriter
+    played = []  # [(moves as index pairs, result value)]
+    expected = []  # [(planes, side, counts, result)] for each position, in order.
+    for _ in range(games):
+        game = ChessVar()
+        while game.get_game_state() == 'UNFINISHED' and len(game.get_moves()) < 200 and game._square_moves():
+            planes = np.zeros((12, 8, 8), dtype=np.uint8)
+            for square, piece in enumerate(game._board):
+                if piece is not None:
+                    plane = PIECE_NAMES.index(piece.get_name()) + (6 if piece.get_color() == 'black' else 0)
+                    planes[plane, square // 8, square % 8] = 1
+            counts = [[game._white_pieces[name] for name in PIECE_NAMES],
+                      [game._black_pieces[name] for name in PIECE_NAMES]]
+            expected.append((planes, int(game._active_player == 'black'), counts))
+            game._make_square_move(*generator.choice(game._square_moves()))
+        result = {'WHITE_WON': 1, 'BLACK_WON': -1}.get(game.get_game_state(), 0)
+        moves = [(SQUARE_INDEX[move_from], SQUARE_INDEX[move_to]) for move_from, move_to in game.get_moves()]
+        expected[len(expected) - len(moves):] = [row + (result,) for row in expected[len(expected) - len(moves):]]
+        played.append((moves, result))
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        record_path = os.path.join(directory, 'games.cvgr')
+        lines_path = os.path.join(directory, 'games.jsonl')
+        with GameRecordWriter(record_path) as writer, open(lines_path, 'w') as lines:
+            for moves, result in played:
+                names = [(SQUARE_NAMES[move_from], SQUARE_NAMES[move_to]) for move_from, move_to in moves]
+                writer.write_moves(names, {1: 'WHITE_WON', -1: 'BLACK_WON'}.get(result, 'UNFINISHED'))
+                print(json.dumps({'moves': [move_from + move_to for move_from, move_to in names],
+                                  'winner': {1: 'white', -1: 'black'}.get(result)}), file=lines)
+        for path in (record_path, lines_path):
+            if [(list(moves), result) for moves, result in read_games(path)] != played:
+                failures.append("read_games differs from the games written to " + os.path.basename(path))
+    for mirror in (False, True):
+        batches = list(iter_batches(played, 37, mirror))
+        if any(len(batch['result']) > 37 for batch in batches):
+            failures.append(f"mirror={mirror}: a batch holds more than 37 rows")
+        rows = [(batch['planes'][row], batch['side'][row], batch['counts'][row], batch['result'][row])
+                for batch in batches for row in range(len(batch['result']))]
+        if len(rows) != len(expected) * (2 if mirror else 1):
+            failures.append(f"mirror={mirror}: {len(rows)} rows for {len(expected)} positions")
+            continue
+        for index, row in enumerate(rows):
+            planes, side, counts, result = expected[index // 2 if mirror else index]
+            if mirror and index % 2:
+                planes = planes[:, :, ::-1]
+            if not np.array_equal(row[0], planes) or row[1] != side or row[2].tolist() != counts or row[3] != result:
+                failures.append(f"mirror={mirror}: row {index} differs from its position")
+                break
+    return failures
+
+
+def check_replay(generator, games):
+    """ChessRecord.GameRecordReader replays against the games recorded: writes games long random games, the first of
+    3000 plies and the rest of a few hundred, to a temporary record file, replays each with and without verification,
+    and compares the positions, the history checkpoints, which an unverified replay must take as well, and seeks to
+    random plies. Returns a list of failure descriptions."""
+    from ChessRecord import GameRecordReader, GameRecordWriter
+    failures = []
+    played = [_long_game(generator, 3000 if number == 0 else generator.randint(100, 400)) for number in range(games)]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'games.cvgr')
+        with GameRecordWriter(path) as writer:
+            for game in played:
+                writer.write_game(game)
+        with GameRecordReader(path) as reader:
+            for number, game in enumerate(played):
+                for verify in (False, True):
+                    replayed = reader.replay(number, verify)
+                    if _game_key(replayed) != _game_key(game) or replayed._checkpoints != game._checkpoints or \
+                            len(replayed._checkpoints) != -(-len(game.get_moves()) // replayed._checkpoint_interval):
+                        failures.append(f"game {number}: replay with verify={verify} differs, "
+                                        f"{len(replayed._checkpoints)} checkpoints")
+                        break
+                    ply = generator.randint(0, len(game.get_moves()))
+                    replayed.seek(ply)
+                    expected = ChessVar()
+                    expected.make_moves(game.get_moves()[:ply])
+                    if _game_key(replayed)[:3] != _game_key(expected)[:3]:
+                        failures.append(f"game {number}: seek to ply {ply} after replay with verify={verify} differs")
+                        break
+    return failures
+
+
+def check_playout(generator, games):
+    """ChessMCTS.PlayoutBoard against ChessVar: plays games random games on both, comparing states after every ply and
+    the moves each offers, which for PlayoutBoard is a single winning capture when there is one and otherwise every
+    legal move, and checking that a move ends the game on both or on neither. Returns a list of failure descriptions."""
+    from ChessMCTS import BLACK, WHITE, PlayoutBoard
+    winners = {WHITE: 'WHITE_WON', BLACK: 'BLACK_WON'}
+    failures = []
+    for number in range(games):
+        game = ChessVar()
+        board = PlayoutBoard(PlayoutBoard.state_of(game))
+        while True:
+            expected = sorted(game._square_moves())
+            winning = {(SQUARE_INDEX[move_from], SQUARE_INDEX[move_to])
+                       for move_from, move_to in game.winning_captures()}
+            moves = board.moves()
+            if board.get_state() != PlayoutBoard.state_of(game) or \
+                    (len(moves) != 1 or moves[0] not in winning if winning else sorted(moves) != expected):
+                failures.append(f"game {number}: position or moves differ at {game.get_position()}")
+                break
+            if not expected or len(game.get_moves()) >= 300:
+                break
+            move = generator.choice(expected)
+            winner = board.apply(*move)
+            game._make_square_move(*move)
+            if (winners[winner] if winner >= 0 else 'UNFINISHED') != game.get_game_state():
+                failures.append(f"game {number}: game state differs at {game.get_position()}")
+                break
+            if winner >= 0:
+                break
+    return failures
+
+
+def _lookahead(tablebase, game):
+    """Returns the (result, plies) that one ply of lookahead over tablebase's results for the positions after each of
+    game's moves gives for game's position, as the tables define results: a capture wins in one ply, a move to a lost
+    position wins in one more ply than that loss, and a side with only moves to won positions loses in one more ply
+    than the longest of those wins. Anything else, including having no legal move, is a draw."""
+    enemy = game._color_bitboards['black' if game._active_player == 'white' else 'white']
+    wins, losses = [], []  # Plies of the positions after each move, from the opponent's point of view.
+    moves = game._square_moves()
+    for from_square, to_square in moves:
+        if enemy >> to_square & 1:
+            return 'win', 1
+        game._apply_move(from_square, to_square)
+        result, plies = tablebase.probe(game)
+        game._undo_move()
+        if result == 'loss':
+            losses.append(plies)
+        elif result == 'win':
+            wins.append(plies)
+    if losses:
+        return 'win', min(losses) + 1
+    if moves and len(wins) == len(moves):
+        return 'loss', max(wins) + 1
+    return 'draw', 0
+
+
+def check_tablebase(generator, games):
+    """ChessTablebase's generated tables against one ply of lookahead over their own results: solves a few three-piece
+    material sets into a temporary directory and checks 20 * games random positions of each, which also checks the
+    probe's indexing against the generator's. Returns a list of failure descriptions."""
+    from ChessTablebase import Tablebase, generate_table, parse_material  # Generation needs NumPy.
+    failures = []
+    with tempfile.TemporaryDirectory() as directory, Tablebase(directory) as tablebase:
+        for material in ('KRvK', 'KPvK', 'KvKN'):
+            generate_table(material, directory)
+            pieces = parse_material(material)
+            for _ in range(20 * games):
+                board = ['1'] * 64
+                for (color, name), square in zip(pieces, generator.sample(range(64), len(pieces))):
+                    board[square] = PIECE_LETTERS[name].upper() if color == 'white' else PIECE_LETTERS[name]
+                position = '/'.join(''.join(board[8 * rank:8 * rank + 8]) for rank in range(7, -1, -1)) + ' ' + \
+                    generator.choice('wb') + ' 1'
+                game = ChessVar.from_position(position, absent_types_lose=False)
+                expected = _lookahead(tablebase, game)
+                if tablebase.probe(game) != expected:
+                    failures.append(f"{material}: probe {tablebase.probe(game)} but lookahead {expected} at "
+                                    f"{game.get_position()}")
+    return failures
+
+
+def _game_key(game):
+    """Returns everything about game's position and history that two games playing the same moves must agree on."""
+    return (game.get_position(), game.get_game_state(), game.get_hash(), game.get_moves(),
+            game.get_history_length(), game._snapshot())
+
+
+def check_copies(generator, games):
+    """Deep copies and pickled copies of ChessVar games against the games they were taken from: plays games random
+    games, copying each at a random ply both ways, then plays the same random moves and take-backs on all three and
+    compares them after each, including the checkpoint snapshots and ChessMCTS's state tuples, which look the shared
+    piece instances up by identity. Returns a list of failure descriptions."""
+    from ChessMCTS import PlayoutBoard
+    failures = []
+    for number in range(games):
+        game = ChessVar()
+        copy_ply = generator.randint(0, 40)
+        boards = [game]
+        while game.get_game_state() == 'UNFINISHED' and len(game.get_moves()) < 120:
+            if len(game.get_moves()) == copy_ply and len(boards) == 1:
+                boards += [copy.deepcopy(game), pickle.loads(pickle.dumps(game))]
+            moves = game._square_moves()
+            if not moves:
+                break
+            move = generator.choice(moves)
+            take_back = generator.random() < 0.1
+            try:
+                for board in boards:
+                    board.make_move(SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]])
+                    if take_back:
+                        board.step_back()
+                        board.step_forward()
+                states = [PlayoutBoard.state_of(board) for board in boards]
+            except (KeyError, ValueError) as error:
+                failures.append(f"game {number}: {type(error).__name__} {error} on a copy at {game.get_position()}")
+                break
+            if any(_game_key(board) != _game_key(game) for board in boards) or len(set(states)) != 1:
+                failures.append(f"game {number}: copy differs at {game.get_position()}")
+                break
+    return failures
+
+
+def check_history(generator, games):
+    """ChessVar's history navigation against replaying the moves from the start: plays games random games, then seeks
+    to random plies, steps back and forth, changes the checkpoint interval, and branches off with new moves, comparing
+    each position with a fresh game given the same moves. A listener follows the moves through the instrumentation
+    events, as ChessRecord.GameRecorder does, and must agree with get_moves throughout. Returns a list of failure
+    descriptions."""
+    failures = []
+    for number in range(games):
+        game = ChessVar()
+        game.set_checkpoint_interval(generator.randint(1, 12))
+        followed = []
+
+        def follow(board, event, details):
+            if event == 'move':
+                followed.append((details['from'], details['to']))
+            elif event == 'unmake':
+                followed.pop()
+            elif event == 'state':
+                followed[:] = board.get_moves()
+        game.enable_instrumentation(follow)
+        while game.get_game_state() == 'UNFINISHED' and len(game.get_moves()) < 100 and game._square_moves():
+            game._make_square_move(*generator.choice(game._square_moves()))
+        followed[:] = game.get_moves()
+        for step in range(60):
+            action = generator.random()
+            if action < 0.3:
+                game.seek(generator.randint(0, game.get_history_length()))
+            elif action < 0.5:
+                game.step_back()
+            elif action < 0.7:
+                game.step_forward()
+            elif action < 0.8:
+                game.set_checkpoint_interval(generator.randint(1, 12))
+            elif game.get_game_state() == 'UNFINISHED' and game._square_moves():
+                from_square, to_square = generator.choice(game._square_moves())
+                game.make_move(SQUARE_NAMES[from_square], SQUARE_NAMES[to_square])
+            replayed = ChessVar()
+            replayed.make_moves(game.get_moves())
+            if followed != game.get_moves():
+                failures.append(f"game {number} step {step}: listener lost track at {game.get_position()}")
+                break
+            if _game_key(replayed)[:4] != _game_key(game)[:4] or _attack_errors(game) is not None:
+                failures.append(f"game {number} step {step}: position differs from a replay at {game.get_position()}")
+                break
+    return failures
+
+
+# (name, check function, module the check needs beyond the standard library or None). A check function takes a
+# random.Random and a number of games and returns a list of failure descriptions, empty when everything agrees.
+CHECKS = (
+    ('attacks', check_attacks, None),
+    ('batch', check_batch, 'numpy'),
+    ('copies', check_copies, None),
+    ('dataset', check_dataset, 'numpy'),
+    ('history', check_history, None),
+    ('instrumentation', check_instrumentation, None),
+    ('playout', check_playout, None),
+    ('range_cache', check_range_cache, None),
+    ('record', check_record, None),
+    ('replay', check_replay, None),
+    ('tablebase', check_tablebase, 'numpy'),
+)
+
+
+def run_checks(names=None, seed=0, games=50, out=sys.stdout):
+    """Runs the checks named in names, every check if None, printing one line per check. Returns the list of (check
+    name, failure description) pairs, which is empty when everything agrees."""
+    failures = []
+    for name, check, requires in CHECKS:
+        if names is not None and name not in names:
+            continue
+        if requires is not None and importlib.util.find_spec(requires) is None:
+            print(f"{name:<16} skipped ({requires} not installed)", file=out)
+            continue
+        start = time.perf_counter()
+        found = check(random.Random(seed), games)
+        status = 'ok' if not found else str(len(found)) + ' FAILURES'
+        print(f"{name:<16} {games:>5} games  {time.perf_counter() - start:8.1f} s  {status}", file=out)
+        for failure in found[:10]:
+            print("    " + failure, file=out)
+        failures += [(name, failure) for failure in found]
+    return failures
+
+
+def main(argv=None):
+    """Command line entry point. Returns the process exit status."""
+    names = [name for name, _, _ in CHECKS]
+    parser = argparse.ArgumentParser(description="Randomized cross-checks for ChessVar.")
+    parser.add_argument('checks', nargs='*', help="checks to run: " + ", ".join(names))
+    parser.add_argument('--suite', action='store_true', help="run every check")
+    parser.add_argument('--games', type=int, default=50, help="random games per check (default 50)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default 0)")
+    args = parser.parse_args(argv)
+    if not args.suite and not args.checks:
+        parser.error("name checks to run, or use --suite")
+    for name in args.checks:
+        if name not in names:
+            parser.error("unknown check: " + name)
+    failures = run_checks(None if args.suite else args.checks, args.seed, args.games)
+    print("all checks agree" if not failures else str(len(failures)) + " failures")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Training data export for ChessVar. Replays games through ChessVar and turns every position into NumPy
+#     feature arrays, streamed in fixed-size batches so memory stays flat however large the corpus, optionally adding
+#     each position's left-right mirror image, and writes the batches as .npz shards, one input file per worker
+#     process. Reads ChessRecord game record files and the JSON lines ChessTournament prints. Requires NumPy, which
+#     the rest of the project does not. Run as a script, e.g. "python ChessDataset.py games.jsonl --directory data".
+#
+#     Each position, taken before every move of a game, is one row of these arrays:
+#         planes   uint8 (12, 8, 8)  one plane per color and type, white's six then black's in PIECE_NAMES order,
+#                                    indexed [rank][file] from a1, 1 where such a piece stands
+#         side     int8              0 white to move, 1 black to move
+#         counts   int8 (2, 6)       pieces left per color (white, black) and type, as in _white_pieces/_black_pieces
+#         result   int8              how the game ended, for white: 1 white won, -1 black won, 0 unfinished or drawn
+#     Mirroring the files maps legal play onto legal play, since nothing in the rules tells the king's side from the
+#     queen's, so a mirrored position keeps its counts, side to move, and result.
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ChessRecord import MAGIC as RECORD_MAGIC, GameRecordReader
+from ChessVar import ChessVar, PIECE_NAMES, SQUARE_INDEX, SQUARE_NAMES
+
+RESULT_VALUES = {'UNFINISHED': 0, 'WHITE_WON': 1, 'BLACK_WON': -1}
+WINNER_VALUES = {None: 0, 'white': 1, 'black': -1}  # ChessTournament's 'winner'.
+SHARD_SUFFIX = '.npz'
+
+
+def read_games(path):
+    """Yields (moves, result) for every game in a ChessRecord file or a file of ChessTournament JSON lines, moves as
+    (from_square, to_square) index pairs and result as in the result array. Games are read one at a time. Raises
+    ValueError for a JSON line that is not a game."""
+    with open(path, 'rb') as file:
+        is_record = file.read(len(RECORD_MAGIC)) == RECORD_MAGIC
+    if is_record:
+        with GameRecordReader(path) as reader:
+            for number in range(len(reader)):
+                yield reader.get_square_moves(number), RESULT_VALUES[reader.get_result(number)]
+        return
+    with open(path) as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                game = json.loads(line)
+                moves = [(SQUARE_INDEX[move[:2]], SQUARE_INDEX[move[2:]]) for move in game['moves']]
+                result = WINNER_VALUES[game.get('winner')]
+            except (ValueError, KeyError, TypeError):
+                raise ValueError(str(path) + " line " + str(line_number) + ": not a game") from None
+            yield moves, result
+
+
+def iter_batches(games, batch_size=4096, mirror=False):
+    """Yields dictionaries of feature arrays, 'planes', 'side', 'counts', and 'result', for every position in games,
+    an iterable of (moves, result) such as read_games yields, in batches of at most batch_size rows. With mirror,
+    every position is followed in the batch by its mirror image, taking two rows. Only one batch is held at a time.
+    Raises ValueError naming the game and ply of a move ChessVar rejects."""
+    positions = batch_size // 2 if mirror else batch_size
+    if positions < 1:
+        raise ValueError("batch size too small: " + str(batch_size))
+    bitboards = np.zeros((positions, 12), dtype=np.uint64)
+    counts = np.zeros((positions, 2, 6), dtype=np.int8)
+    side = np.zeros(positions, dtype=np.int8)
+    result = np.zeros(positions, dtype=np.int8)
+    filled = 0
+    for number, (moves, game_result) in enumerate(games):
+        game = ChessVar()
+        for ply, (from_square, to_square) in enumerate(moves):
+            white, black = game._piece_bitboards['white'], game._piece_bitboards['black']
+            bitboards[filled] = [white[name] for name in PIECE_NAMES] + [black[name] for name in PIECE_NAMES]
+            counts[filled, 0] = [game._white_pieces[name] for name in PIECE_NAMES]
+            counts[filled, 1] = [game._black_pieces[name] for name in PIECE_NAMES]
+            side[filled] = game._active_player == 'black'
+            result[filled] = game_result
+            filled += 1
+            if filled == positions:
+                yield _features(bitboards, counts, side, result, filled, mirror)
+                filled = 0
+            if not game._make_square_move(from_square, to_square):
+                raise ValueError("game " + str(number) + " ply " + str(ply + 1) + ": illegal move " +
+                                 SQUARE_NAMES[from_square] + SQUARE_NAMES[to_square])
+    if filled:
+        yield _features(bitboards, counts, side, result, filled, mirror)
+
+
+def _features(bitboards, counts, side, result, filled, mirror):
+    """Returns the feature dictionary for the first filled rows of the batch buffers, as new arrays. Bit n of a
+    bitboard is square n, rank * 8 + file, so unpacking each little-endian byte, least significant bit first, lays
+    the squares out rank by rank."""
+    planes = np.unpackbits(bitboards[:filled].astype('<u8').view(np.uint8).reshape(filled, 12, 8), axis=-1,
+                           bitorder='little').reshape(filled, 12, 8, 8)
+    features = {'planes': planes, 'side': side[:filled].copy(), 'counts': counts[:filled].copy(),
+                'result': result[:filled].copy()}
+    if mirror:
+        features = {key: np.stack((value, value), axis=1).reshape((2 * filled,) + value.shape[1:])
+                    for key, value in features.items()}
+        features['planes'][1::2] = features['planes'][1::2, :, :, ::-1]
+    return features
+
+
+def export_file(path, directory='.', shard_size=65536, mirror=False, compress=False):
+    """Writes the features of every position in the games in path to .npz shards of shard_size rows in directory,
+    named after the input file, e.g. games-00000.npz. Returns (path, rows written, shard paths)."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    save = np.savez_compressed if compress else np.savez
+    shards = []
+    rows = 0
+    for features in iter_batches(read_games(path), shard_size, mirror):
+        shard = os.path.join(directory, stem + '-' + format(len(shards), '05d') + SHARD_SUFFIX)
+        with open(shard + '.tmp', 'wb') as file:
+            save(file, **features)
+        os.replace(shard + '.tmp', shard)
+        shards.append(shard)
+        rows += len(features['result'])
+    return path, rows, shards
+
+
+def export(paths, directory='.', shard_size=65536, mirror=False, compress=False, workers=None):
+    """Exports each input file in paths with export_file, one per worker process at a time (one per CPU by default),
+    and yields export_file's result for each in input order. With workers=1 they are exported in this process. Raises
+    ValueError if two inputs would write shards of the same name."""
+    stems = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+    if len(set(stems)) != len(stems):
+        raise ValueError("input files must have different names")
+    os.makedirs(directory, exist_ok=True)
+    count = len(paths)
+    if workers == 1:
+        for path in paths:
+            yield export_file(path, directory, shard_size, mirror, compress)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(export_file, paths, [directory] * count, [shard_size] * count, [mirror] * count,
+                                   [compress] * count):
+            yield result
+
+
+def main(argv=None):
+    """Command line entry point. Exports the files named on the command line. Returns the exit status."""
+    parser = argparse.ArgumentParser(description="Export ChessVar games as NumPy training data.")
+    parser.add_argument('inputs', nargs='+', help="ChessRecord files or ChessTournament JSON lines")
+    parser.add_argument('--directory', default='.', help="where to write the shards (default: current directory)")
+    parser.add_argument('--shard-size', type=int, default=65536, help="rows per shard (default 65536)")
+    parser.add_argument('--mirror', action='store_true', help="add every position's left-right mirror image")
+    parser.add_argument('--compress', action='store_true', help="write compressed .npz shards")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    total = 0
+    try:
+        for path, rows, shards in export(args.inputs, args.directory, args.shard_size, args.mirror, args.compress,
+                                         args.workers):
+            total += rows
+            print(f"{path}: {rows} rows in {len(shards)} shards")
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+    print(f"{total} rows ({total / elapsed:,.0f} rows/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,401 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Search engine for ChessVar. Includes class Engine, an alpha-beta searcher with an evaluation built
+#     around the capture-all-of-one-type win rule, class SearchResult for what a search found, and class
+#     TranspositionTable, a fixed-size store of search results keyed on ChessVar.get_hash(), so positions reached by
+#     different move orders are only searched once.
+
+import time
+
+from ChessVar import OPPONENT, PIECE_NAMES, SQUARE_NAMES, iter_squares
+
+WIN_SCORE = 100000  # Score for capturing the last piece of a type, less one per ply it takes.
+INFINITY = WIN_SCORE + 1
+MAX_PLY = 128
+
+# Score for having a number of pieces of one type left, indexed by count. Differences between neighbouring entries are
+# what a capture of that type is worth; losing down to one piece of a type is the most expensive. Flat beyond eight,
+# the most the start position has, up to the 64 pieces of one type a from_position board can hold.
+TYPE_SAFETY = (0, 0, 120, 180, 220, 250, 270, 285, 300) + (300,) * 56
+
+# Capture ordering tie-break: cheaper attackers first, so a pawn takes before a queen does.
+ATTACKER_ORDER = {'pawn': 0, 'knight': 1, 'bishop': 2, 'rook': 3, 'queen': 4, 'king': 5}
+
+# Small bonus for pieces near the centre of the board, indexed by square.
+CENTRALITY = tuple(2 * (3 - max(abs(2 * (square // 8) - 7), abs(2 * (square % 8) - 7)) // 2) for square in range(64))
+
+EXACT = 0  # Stored score is the exact value of the position.
+LOWER_BOUND = 1  # Search failed high; the position is worth at least the stored score.
+UPPER_BOUND = 2  # Search failed low; the position is worth at most the stored score.
+
+
+class TranspositionTable:
+    """Represents a fixed-size table of search results keyed on 64-bit position hashes. Each bucket holds two entries:
+    a depth-preferred entry, only replaced by a search at least as deep, and an always-replace entry that takes
+    everything else, including the entry a deeper search pushes out. Keeps hit, miss, and store counts."""
+
+    def __init__(self, size=1 << 16):
+        if size < 1 or size & (size - 1):
+            raise ValueError("transposition table size must be a power of two")
+        self._mask = size - 1
+        self._deep_entries = [None] * size  # [(key, depth, score, flag, move) or None], depth-preferred.
+        self._recent_entries = [None] * size  # [(key, depth, score, flag, move) or None], always-replace.
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+
+    def probe(self, key):
+        """Returns the stored (key, depth, score, flag, move) for a position hash, or None if it is not stored."""
+        index = key & self._mask
+        entry = self._deep_entries[index]
+        if entry is not None and entry[0] == key:
+            self._hits += 1
+            return entry
+        entry = self._recent_entries[index]
+        if entry is not None and entry[0] == key:
+            self._hits += 1
+            return entry
+        self._misses += 1
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        """Stores a search result. flag is EXACT, LOWER_BOUND, or UPPER_BOUND, and move is the best move found as a
+        (from_square, to_square) pair, or None."""
+        index = key & self._mask
+        entry = (key, depth, score, flag, move)
+        deep_entry = self._deep_entries[index]
+        if deep_entry is None or deep_entry[0] == key:
+            self._deep_entries[index] = entry
+        elif depth >= deep_entry[1]:
+            self._deep_entries[index] = entry
+            self._recent_entries[index] = deep_entry
+        else:
+            self._recent_entries[index] = entry
+        self._stores += 1
+
+    def clear(self):
+        """Empties the table and resets its statistics."""
+        self._deep_entries = [None] * len(self._deep_entries)
+        self._recent_entries = [None] * len(self._recent_entries)
+        self._hits = self._misses = self._stores = 0
+
+    def get_size(self):
+        """Returns the number of buckets."""
+        return self._mask + 1
+
+    def get_stats(self):
+        """Returns a dictionary of hits, misses, stores, hit rate, and the number of filled entries."""
+        probes = self._hits + self._misses
+        return {'hits': self._hits, 'misses': self._misses, 'stores': self._stores,
+                'hit_rate': self._hits / probes if probes else 0.0,
+                'filled': sum(entry is not None for entry in self._deep_entries + self._recent_entries)}
+
+
+class SearchResult:
+    """Represents the outcome of a search: best move, score, depth reached, node count, time taken, and principal
+    variation. Moves are pairs of algebraic squares."""
+
+    def __init__(self, move, score, depth, nodes, elapsed, principal_variation):
+        self._move = move  # ('from', 'to') or None
+        self._score = score  # Centipawn-like score from the searching player's point of view.
+        self._depth = depth
+        self._nodes = nodes
+        self._elapsed = elapsed  # Seconds.
+        self._principal_variation = principal_variation  # [('from', 'to')]
+
+    def get_move(self):
+        """Returns best move."""
+        return self._move
+
+    def get_score(self):
+        """Returns score."""
+        return self._score
+
+    def get_depth(self):
+        """Returns depth of the last completed iteration."""
+        return self._depth
+
+    def get_nodes(self):
+        """Returns number of nodes searched."""
+        return self._nodes
+
+    def get_elapsed(self):
+        """Returns time taken in seconds."""
+        return self._elapsed
+
+    def get_nodes_per_second(self):
+        """Returns nodes searched per second."""
+        return self._nodes / self._elapsed if self._elapsed > 0 else 0.0
+
+    def get_principal_variation(self):
+        """Returns principal variation, the expected line of play starting with the best move."""
+        return self._principal_variation
+
+
+class Engine:
+    """Represents a negamax alpha-beta searcher for ChessVar, with iterative deepening, a transposition table,
+    quiescence search on captures, and an evaluation built around the win rule. Works directly on ChessVar's
+    square-index internals and always leaves the game as it found it. Given a ChessTablebase.Tablebase, positions it
+    covers are scored exactly instead of searched, and at the root its move is played without searching at all."""
+
+    def __init__(self, transposition_table=None, quiescence=True, tablebase=None):
+        self._table = transposition_table if transposition_table is not None else TranspositionTable()
+        self._quiescence = quiescence
+        self._tablebase = tablebase
+        self._tablebase_pieces = tablebase.get_max_pieces() if tablebase is not None else 0
+        self._nodes = 0
+        self._deadline = None  # time.perf_counter() value to stop at, or None.
+        self._stopped = False
+        self._stop_requested = False  # Set by stop, possibly from another thread, before or during a search.
+
+    def get_transposition_table(self):
+        """Returns transposition table."""
+        return self._table
+
+    def stop(self):
+        """Makes a search running in another thread return as soon as possible, with the deepest iteration it
+        completed, as if its time had run out. A stop that arrives before the search starts applies to it. The request
+        is cleared when the search returns."""
+        self._stop_requested = True
+        self._stopped = True
+
+    def search(self, game, depth=4, time_limit=None, on_iteration=None):
+        """Searches game's position for the active player, deepening one ply at a time up to depth, or until
+        time_limit seconds have passed if given (depth None searches until the time runs out). Returns a SearchResult
+        for the deepest completed iteration. If on_iteration is given, it is called with a SearchResult after each
+        completed iteration."""
+        if depth is None and time_limit is None:
+            raise ValueError("search needs a depth or a time limit")
+        try:
+            return self._search(game, depth, time_limit, on_iteration)
+        finally:
+            self._stop_requested = False
+
+    def _search(self, game, depth, time_limit, on_iteration):
+        """Does the work of search, which clears any stop request however this returns."""
+        start = time.perf_counter()
+        self._nodes = 0
+        self._stopped = self._stop_requested
+        self._deadline = start + time_limit if time_limit is not None else None
+        if game._game_state != 'UNFINISHED':
+            # Nothing to search. Scored for the active player, who in a won game is the side that made the last move.
+            won = (game._game_state == 'WHITE_WON') == (game._active_player == 'white')
+            return SearchResult(None, WIN_SCORE if won else -WIN_SCORE, 0, 0, time.perf_counter() - start, [])
+        if self._tablebase is not None and self._tablebase.probe(game) is not None:
+            move = self._tablebase.best_move(game)
+            score = _tablebase_score(self._tablebase.probe(game), 0)
+            return SearchResult(move, score, 0, 0, time.perf_counter() - start, [move] if move is not None else [])
+        move, score, completed = None, 0, 0
+        moves = _ordered_moves(game, False, None)
+        if moves:
+            move = moves[0]
+        iteration = 1
+        while moves and (depth is None or iteration <= depth) and iteration < MAX_PLY:
+            iteration_move, iteration_score = self._search_root(game, iteration, moves)
+            if self._stopped:
+                break
+            move, score, completed = iteration_move, iteration_score, iteration
+            if on_iteration is not None:
+                principal_variation = self._principal_variation(game, move)
+                on_iteration(SearchResult(principal_variation[0], score, completed, self._nodes,
+                                          time.perf_counter() - start, principal_variation))
+            if score >= WIN_SCORE - MAX_PLY:
+                break  # Forced win found; deeper search cannot improve on it.
+            moves.remove(move)
+            moves.insert(0, move)
+            iteration += 1
+        elapsed = time.perf_counter() - start
+        principal_variation = self._principal_variation(game, move)
+        return SearchResult(principal_variation[0] if principal_variation else None, score, completed, self._nodes,
+                            elapsed, principal_variation)
+
+    def _search_root(self, game, depth, moves):
+        """Searches every root move to depth and returns (best move, score)."""
+        alpha, beta = -INFINITY, INFINITY
+        best_move = moves[0]
+        for move in moves:
+            game._apply_move(*move)
+            score = -self._negamax(game, depth - 1, -beta, -alpha, 1)
+            game._undo_move()
+            if self._stopped:
+                break
+            if score > alpha:
+                alpha, best_move = score, move
+        if not self._stopped:
+            self._table.store(game.get_hash(), depth, alpha, EXACT, best_move)
+        return best_move, alpha
+
+    def _negamax(self, game, depth, alpha, beta, ply):
+        """Returns the score of game's position from the point of view of the player to move, searched depth plies."""
+        self._nodes += 1
+        if not self._nodes & 1023 and self._deadline is not None and time.perf_counter() >= self._deadline:
+            self._stopped = True
+        if self._stopped:
+            return 0
+        if game._game_state != 'UNFINISHED':
+            return ply - WIN_SCORE  # The last move captured the final piece of a type.
+        if self._tablebase_pieces and \
+                (game._color_bitboards['white'] | game._color_bitboards['black']).bit_count() <= self._tablebase_pieces:
+            result = self._tablebase.probe(game)
+            if result is not None:
+                return _tablebase_score(result, ply)
+        if game._has_winning_capture():
+            return WIN_SCORE - ply - 1  # Nothing beats capturing a last piece next move; no need to list the moves.
+        if depth <= 0:
+            return self._quiescent(game, alpha, beta, ply) if self._quiescence else evaluate(game)
+
+        key = game.get_hash()
+        entry = self._table.probe(key)
+        table_move = None
+        if entry is not None:
+            table_move = entry[4]
+            if entry[1] >= depth:
+                score = _score_from_table(entry[2], ply)
+                if entry[3] == EXACT or (entry[3] == LOWER_BOUND and score >= beta) or \
+                        (entry[3] == UPPER_BOUND and score <= alpha):
+                    return score
+
+        moves = _ordered_moves(game, False, table_move)
+        if not moves:
+            return 0  # The player to move is stuck; treated as a draw.
+        original_alpha = alpha
+        best_score, best_move = -INFINITY, moves[0]
+        for move in moves:
+            game._apply_move(*move)
+            score = -self._negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            game._undo_move()
+            if self._stopped:
+                return 0
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self._table.store(key, depth, _score_to_table(best_score, ply), flag, best_move)
+        return best_score
+
+    def _quiescent(self, game, alpha, beta, ply):
+        """Returns the score of game's position searching only captures, so the evaluation is never taken in the
+        middle of an exchange. Checks the deadline as _negamax does, since capture sequences can run long."""
+        self._nodes += 1
+        if not self._nodes & 1023 and self._deadline is not None and time.perf_counter() >= self._deadline:
+            self._stopped = True
+        if self._stopped:
+            return 0
+        if game._game_state != 'UNFINISHED':
+            return ply - WIN_SCORE
+        if game._has_winning_capture():
+            return WIN_SCORE - ply - 1
+        stand_pat = evaluate(game)
+        if stand_pat >= beta or ply >= MAX_PLY:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+        for move in _ordered_moves(game, True, None):
+            game._apply_move(*move)
+            score = -self._quiescent(game, -beta, -alpha, ply + 1)
+            game._undo_move()
+            if self._stopped:
+                return 0
+            if score > alpha:
+                alpha = score
+                if alpha >= beta:
+                    break
+        return alpha
+
+    def _principal_variation(self, game, move):
+        """Returns the expected line starting with move, following best moves stored in the transposition table."""
+        line = []
+        seen = set()
+        while move is not None and game._game_state == 'UNFINISHED' and game.get_hash() not in seen and \
+                game._board[move[0]] is not None and game._board[move[0]].get_color() == game._active_player and \
+                game._range_mask(move[0]) >> move[1] & 1:
+            seen.add(game.get_hash())
+            line.append(move)
+            game._apply_move(*move)
+            entry = self._table.probe(game.get_hash())
+            move = entry[4] if entry is not None else None
+        for _ in line:
+            game._undo_move()
+        return [(SQUARE_NAMES[move_from], SQUARE_NAMES[move_to]) for move_from, move_to in line]
+
+
+def evaluate(game):
+    """Returns the static score of game's position from the active player's point of view.
+
+    In this variant a side loses when any one of its piece types runs out, so a side is only as safe as its scarcest
+    types. Each type is scored by how many pieces of it remain, with steeply diminishing returns: losing the second to
+    last knight costs far more than losing one of eight pawns. Centralised pieces get a small bonus."""
+    score = 0
+    for name in PIECE_NAMES:
+        score += TYPE_SAFETY[game._white_pieces[name]] - TYPE_SAFETY[game._black_pieces[name]]
+    for square in iter_squares(game._color_bitboards['white']):
+        score += CENTRALITY[square]
+    for square in iter_squares(game._color_bitboards['black']):
+        score -= CENTRALITY[square]
+    return score if game._active_player == 'white' else -score
+
+
+def _ordered_moves(game, captures_only, first_move):
+    """Returns the active player's moves as (from_square, to_square) pairs, best candidates first: first_move, then
+    captures of the last piece of a type (which win outright), then other captures by most valuable victim and least
+    valuable attacker, then quiet moves. With captures_only, quiet moves are left out."""
+    board = game._board
+    color = game._active_player
+    own = game._color_bitboards[color]
+    enemy = game._color_bitboards[OPPONENT[color]]
+    enemy_counts = game._black_pieces if color == 'white' else game._white_pieces
+    scored = []
+    quiet = []
+    for from_square in iter_squares(own):
+        piece = board[from_square]
+        targets = game._range_mask(from_square)
+        for to_square in iter_squares(targets & enemy):
+            count = enemy_counts[board[to_square].get_name()]
+            victim = WIN_SCORE if count == 1 else TYPE_SAFETY[count] - TYPE_SAFETY[count - 1]
+            scored.append((victim * 16 - ATTACKER_ORDER[piece.get_name()], (from_square, to_square)))
+        if not captures_only:
+            for to_square in iter_squares(targets & ~enemy):
+                quiet.append((from_square, to_square))
+    scored.sort(reverse=True)
+    moves = [move for _, move in scored] + quiet
+    if first_move is not None and first_move in moves:
+        moves.remove(first_move)
+        moves.insert(0, first_move)
+    return moves
+
+
+def _tablebase_score(result, ply):
+    """Converts a tablebase probe result, ('win', 'loss', or 'draw', plies), to a search score at ply."""
+    outcome, plies = result
+    if outcome == 'win':
+        return WIN_SCORE - ply - plies
+    if outcome == 'loss':
+        return ply + plies - WIN_SCORE
+    return 0
+
+
+def _score_to_table(score, ply):
+    """Converts a win/loss score from distance-from-root to distance-from-this-position for storing."""
+    if score >= WIN_SCORE - MAX_PLY:
+        return score + ply
+    if score <= MAX_PLY - WIN_SCORE:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    """Converts a stored win/loss score back to distance-from-root."""
+    if score >= WIN_SCORE - MAX_PLY:
+        return score - ply
+    if score <= MAX_PLY - WIN_SCORE:
+        return score + ply
+    return score
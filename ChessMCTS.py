@@ -0,0 +1,445 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Monte-Carlo tree search player for ChessVar. Includes class PlayoutBoard, a stripped-down board of
+#     plain lists that generates moves and plays random games without creating objects, class MCTSPlayer, a UCT
+#     searcher that keeps its tree between moves and can spread a search over worker processes, and class MCTSResult
+#     for what a search found. Run as a script, e.g. "python ChessMCTS.py --iterations 20000 --workers 4", to search a
+#     position and report playouts per second.
+#
+#     Games in this variant end as soon as a side loses its last piece of any type, so random games are short, and
+#     playouts are steered by that rule alone: whenever the side to move can capture a last piece, that capture is the
+#     only move considered, in playouts and in the tree alike, since no other move can do better.
+
+import argparse
+import math
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ChessVar import BISHOP, BLACK, KING, KING_ATTACKS, KNIGHT, KNIGHT_ATTACKS, NEGATIVE_BISHOP_RAYS, \
+    NEGATIVE_ROOK_RAYS, PAWN, PAWN_ATTACKS, PIECE_CODES, PIECE_NAMES, POSITIVE_BISHOP_RAYS, POSITIVE_ROOK_RAYS, QUEEN, \
+    ROOK, SQUARE_NAMES, WHITE, ChessVar, iter_squares
+
+DRAW = 2  # Playout outcome besides WHITE and BLACK, which are also the sides to move.
+MAX_MOVES = 256  # More than any position's number of moves.
+
+# Move tables, indexed by square: target squares for the jumping pieces and, for the sliders, each direction's squares
+# in order of distance. Pieces are coded as in ChessVar.PIECE_CODES: 1 + 6 * side + kind.
+STEP_TARGETS = {KING: tuple(tuple(iter_squares(targets)) for targets in KING_ATTACKS),
+                KNIGHT: tuple(tuple(iter_squares(targets)) for targets in KNIGHT_ATTACKS)}
+
+
+def _ordered_rays(positive_rays, negative_rays):
+    """Returns, for every square, a tuple of one tuple per direction holding the squares along it, nearest first,
+    leaving out directions that leave the board at once. Takes ChessVar's ray tables: positive rays run towards higher
+    square numbers, negative rays towards lower."""
+    return tuple(tuple(tuple(iter_squares(rays[square])) for rays in positive_rays if rays[square]) +
+                 tuple(tuple(reversed(tuple(iter_squares(rays[square])))) for rays in negative_rays if rays[square])
+                 for square in range(64))
+
+
+RAYS = {ROOK: _ordered_rays(POSITIVE_ROOK_RAYS, NEGATIVE_ROOK_RAYS),
+        BISHOP: _ordered_rays(POSITIVE_BISHOP_RAYS, NEGATIVE_BISHOP_RAYS),
+        QUEEN: _ordered_rays(POSITIVE_ROOK_RAYS + POSITIVE_BISHOP_RAYS, NEGATIVE_ROOK_RAYS + NEGATIVE_BISHOP_RAYS)}
+PAWN_CAPTURES = (tuple(tuple(iter_squares(targets)) for targets in PAWN_ATTACKS['white']),
+                 tuple(tuple(iter_squares(targets)) for targets in PAWN_ATTACKS['black']))
+PAWN_STEPS = (8, -8)
+PAWN_START_RANKS = (1, 6)
+
+
+class PlayoutBoard:
+    """Represents a position as plain lists: a piece code per square, a count of pieces per code, and the side to
+    move, plus fixed buffers for generated moves. Moves are made in place and never taken back; set_state restores a
+    saved position by copying into the same lists. Follows the same rules as ChessVar.make_move."""
+
+    def __init__(self, state=None):
+        self._squares = [0] * 64  # [piece code or 0]
+        self._counts = [0] * 13  # [pieces left per piece code], index 0 unused.
+        self._side = WHITE
+        self._from = [0] * MAX_MOVES  # Generated moves, from squares.
+        self._to = [0] * MAX_MOVES  # Generated moves, to squares.
+        if state is not None:
+            self.set_state(state)
+
+    @staticmethod
+    def state_of(game):
+        """Returns the state tuple, see get_state, of a ChessVar game's position."""
+        counts = [0] + [game._white_pieces[name] for name in PIECE_NAMES] + \
+            [game._black_pieces[name] for name in PIECE_NAMES]
+        return tuple(PIECE_CODES[piece] for piece in game._board), tuple(counts), \
+            WHITE if game._active_player == 'white' else BLACK
+
+    def get_state(self):
+        """Returns the position as a tuple (square codes, piece counts by code, side to move) that can be pickled."""
+        return tuple(self._squares), tuple(self._counts), self._side
+
+    def set_state(self, state):
+        """Sets the position to a get_state tuple."""
+        self._squares[:] = state[0]
+        self._counts[:] = state[1]
+        self._side = state[2]
+
+    def get_side(self):
+        """Returns WHITE or BLACK, the side to move."""
+        return self._side
+
+    def moves(self):
+        """Returns the moves to consider as a list of (from_square, to_square) pairs: just one winning capture if
+        there is one, otherwise every legal move."""
+        count = self._generate()
+        return list(zip(self._from[:count], self._to[:count]))
+
+    def _generate(self):
+        """Fills the move buffers for the side to move and returns how many moves there are. If a capture of the last
+        piece of a type is found, it alone is returned, as the only move."""
+        squares = self._squares
+        counts = self._counts
+        froms = self._from
+        tos = self._to
+        side = self._side
+        own_low = 1 + 6 * side
+        enemy_low = 7 - 6 * side
+        count = 0
+        for square in range(64):
+            kind = squares[square] - own_low
+            if kind < 0 or kind > PAWN:
+                continue
+            if kind == PAWN:
+                for target in PAWN_CAPTURES[side][square]:
+                    victim = squares[target]
+                    if enemy_low <= victim < enemy_low + 6:
+                        if counts[victim] == 1:
+                            froms[0] = square
+                            tos[0] = target
+                            return 1
+                        froms[count] = square
+                        tos[count] = target
+                        count += 1
+                target = square + PAWN_STEPS[side]
+                if 0 <= target < 64 and not squares[target]:
+                    froms[count] = square
+                    tos[count] = target
+                    count += 1
+                    target += PAWN_STEPS[side]
+                    if square >> 3 == PAWN_START_RANKS[side] and not squares[target]:
+                        froms[count] = square
+                        tos[count] = target
+                        count += 1
+            elif kind == KING or kind == KNIGHT:
+                for target in STEP_TARGETS[kind][square]:
+                    victim = squares[target]
+                    if not victim:
+                        froms[count] = square
+                        tos[count] = target
+                        count += 1
+                    elif enemy_low <= victim < enemy_low + 6:
+                        if counts[victim] == 1:
+                            froms[0] = square
+                            tos[0] = target
+                            return 1
+                        froms[count] = square
+                        tos[count] = target
+                        count += 1
+            else:
+                for ray in RAYS[kind][square]:
+                    for target in ray:
+                        victim = squares[target]
+                        if not victim:
+                            froms[count] = square
+                            tos[count] = target
+                            count += 1
+                            continue
+                        if enemy_low <= victim < enemy_low + 6:
+                            if counts[victim] == 1:
+                                froms[0] = square
+                                tos[0] = target
+                                return 1
+                            froms[count] = square
+                            tos[count] = target
+                            count += 1
+                        break
+        return count
+
+    def apply(self, from_square, to_square):
+        """Makes a move, which must be legal. Returns the side that moved if it captured the last piece of a type and
+        won, otherwise -1."""
+        squares = self._squares
+        victim = squares[to_square]
+        squares[to_square] = squares[from_square]
+        squares[from_square] = 0
+        side = self._side
+        self._side = side ^ 1
+        if victim:
+            self._counts[victim] -= 1
+            if not self._counts[victim]:
+                return side
+        return -1
+
+    def playout(self, generator, max_plies):
+        """Plays random moves, a winning capture whenever there is one, until the game ends or max_plies moves have
+        been made. Returns WHITE or BLACK for the winner, or DRAW if no one won or the side to move has no move."""
+        random_number = generator.random
+        froms = self._from
+        tos = self._to
+        for _ in range(max_plies):
+            count = self._generate()
+            if not count:
+                return DRAW
+            index = int(random_number() * count)
+            winner = self.apply(froms[index], tos[index])
+            if winner >= 0:
+                return winner
+        return DRAW
+
+
+class _Node:
+    """A search tree node: the position after _move, made by side _mover. _result is WHITE, BLACK, or DRAW once the
+    node is known to end the game, otherwise None; _untried is None until the node's moves are generated. Only this
+    module's search functions use nodes, reading and updating their members directly in the search loop."""
+    __slots__ = ('_move', '_mover', '_parent', '_children', '_untried', '_visits', '_wins', '_result')
+
+    def __init__(self, move, mover, parent, result=None):
+        self._move = move  # (from_square, to_square), or None at the root.
+        self._mover = mover
+        self._parent = parent
+        self._children = []
+        self._untried = None  # [(from_square, to_square)] not yet expanded, or None if not generated.
+        self._visits = 0
+        self._wins = 0.0  # Playout wins for mover, draws counting half.
+        self._result = result
+
+
+class MCTSResult:
+    """Represents the outcome of a search: chosen move, its estimated win rate for the side to move, iterations and
+    playouts run, time taken, and each root move's visits and win rate. Moves are pairs of algebraic squares."""
+
+    def __init__(self, move, value, iterations, playouts, elapsed, move_stats):
+        self._move = move  # ('from', 'to') or None
+        self._value = value  # Win rate of move for the side to move, 0.0 to 1.0, draws counting half.
+        self._iterations = iterations
+        self._playouts = playouts
+        self._elapsed = elapsed  # Seconds.
+        self._move_stats = move_stats  # {('from', 'to'): (visits, win rate)}
+
+    def get_move(self):
+        """Returns chosen move, the most visited."""
+        return self._move
+
+    def get_value(self):
+        """Returns the chosen move's win rate for the side to move."""
+        return self._value
+
+    def get_iterations(self):
+        """Returns number of tree iterations run, across every worker."""
+        return self._iterations
+
+    def get_playouts(self):
+        """Returns number of random playouts run, across every worker. Iterations ending on a finished game need
+        none."""
+        return self._playouts
+
+    def get_elapsed(self):
+        """Returns time taken in seconds."""
+        return self._elapsed
+
+    def get_playouts_per_second(self):
+        """Returns playouts per second of wall-clock time, across every worker."""
+        return self._playouts / self._elapsed if self._elapsed > 0 else 0.0
+
+    def get_move_stats(self):
+        """Returns {move: (visits, win rate)} for every root move searched."""
+        return self._move_stats
+
+
+def _search_tree(root, state, iterations, deadline, exploration, max_plies, generator):
+    """Runs iterations iterations of UCT on the tree under root, whose position is state, or fewer if deadline, a
+    time.perf_counter() value, passes first. Returns (iterations run, playouts run)."""
+    board = PlayoutBoard()
+    log = math.log
+    sqrt = math.sqrt
+    playouts = 0
+    done = 0
+    while done < iterations and (deadline is None or time.perf_counter() < deadline):
+        done += 1
+        board.set_state(state)
+        node = root
+        while node._result is None:
+            if node._untried is None:
+                node._untried = board.moves()
+                if not node._untried and not node._children:
+                    node._result = DRAW
+                    break
+            if node._untried:
+                move = node._untried.pop(int(generator.random() * len(node._untried)))
+                side = board.get_side()
+                winner = board.apply(*move)
+                child = _Node(move, side, node, winner if winner >= 0 else None)
+                node._children.append(child)
+                node = child
+                break
+            scale = exploration * exploration * log(node._visits)
+            best_value = -1.0
+            for child in node._children:
+                value = child._wins / child._visits + sqrt(scale / child._visits)
+                if value > best_value:
+                    best_value, node = value, child
+            board.apply(*node._move)
+        if node._result is None:
+            outcome = board.playout(generator, max_plies)
+            playouts += 1
+        else:
+            outcome = node._result
+        while node is not None:
+            node._visits += 1
+            if outcome == node._mover:
+                node._wins += 1.0
+            elif outcome == DRAW:
+                node._wins += 0.5
+            node = node._parent
+    return done, playouts
+
+
+def _root_stats(root):
+    """Returns {(from_square, to_square): (visits, wins)} for root's children."""
+    return {child._move: (child._visits, child._wins) for child in root._children}
+
+
+def _worker_search(state, iterations, time_limit, exploration, max_plies, seed):
+    """Searches a fresh tree from state in a worker process. Returns (root move stats, iterations, playouts)."""
+    root = _Node(None, state[2] ^ 1, None)
+    deadline = time.perf_counter() + time_limit if time_limit is not None else None
+    done, playouts = _search_tree(root, state, iterations, deadline, exploration, max_plies, random.Random(seed))
+    return _root_stats(root), done, playouts
+
+
+class MCTSPlayer:
+    """Represents a UCT Monte-Carlo tree search player. The tree is kept between searches: searching a position two
+    plies or fewer below the last one searched, typically after the player's move and the reply, carries on with the
+    matching subtree. With workers above one, the search also runs in worker processes on fresh trees from the same
+    root, and their root visit counts and wins are added to the player's own before the move is chosen."""
+
+    def __init__(self, exploration=1.4, max_playout_plies=300, seed=None):
+        self._exploration = exploration
+        self._max_playout_plies = max_playout_plies
+        self._generator = random.Random(seed)
+        self._root = None  # Root _Node of the kept tree, or None.
+        self._root_state = None  # PlayoutBoard state of the root's position.
+        self._pool = None  # ProcessPoolExecutor, created on the first search with workers above one.
+        self._pool_size = 0  # Worker processes in the pool, 0 without one.
+
+    def best_move(self, game, iterations=None, time_limit=None, workers=1):
+        """Returns the chosen move for the active player of ChessVar game as a pair of algebraic squares, or None if the
+        game is over or there is no legal move."""
+        return self.search(game, iterations, time_limit, workers).get_move()
+
+    def search(self, game, iterations=None, time_limit=None, workers=1):
+        """Searches game's position for the active player for iterations iterations, or until time_limit seconds have
+        passed, whichever comes first (1000 iterations if neither is given), spread over workers processes including
+        this one. Returns an MCTSResult."""
+        if iterations is None and time_limit is None:
+            iterations = 1000
+        if iterations is None:
+            iterations = sys.maxsize
+        start = time.perf_counter()
+        state = PlayoutBoard.state_of(game)
+        self._reuse_tree(state)
+        if game.get_game_state() != 'UNFINISHED':
+            return MCTSResult(None, 0.0, 0, 0, time.perf_counter() - start, {})
+        futures = []
+        if workers > 1:
+            if self._pool is None or self._pool_size < workers - 1:
+                self.close()
+                self._pool = ProcessPoolExecutor(max_workers=workers - 1)
+                self._pool_size = workers - 1
+            share = -(-iterations // workers) if iterations != sys.maxsize else iterations
+            futures = [self._pool.submit(_worker_search, state, share, time_limit, self._exploration,
+                                         self._max_playout_plies, self._generator.getrandbits(64))
+                       for _ in range(workers - 1)]
+            iterations = max(iterations - share * (workers - 1), 1) if iterations != sys.maxsize else iterations
+        deadline = start + time_limit if time_limit is not None else None
+        done, playouts = _search_tree(self._root, state, iterations, deadline, self._exploration,
+                                      self._max_playout_plies, self._generator)
+        stats = {move: list(totals) for move, totals in _root_stats(self._root).items()}
+        for future in futures:
+            worker_stats, worker_done, worker_playouts = future.result()
+            done += worker_done
+            playouts += worker_playouts
+            for move, (visits, wins) in worker_stats.items():
+                totals = stats.setdefault(move, [0, 0.0])
+                totals[0] += visits
+                totals[1] += wins
+        elapsed = time.perf_counter() - start
+        if not stats:
+            return MCTSResult(None, 0.0, done, playouts, elapsed, {})
+        move = max(stats, key=lambda key: stats[key][0])
+        move_stats = {(SQUARE_NAMES[key[0]], SQUARE_NAMES[key[1]]): (visits, wins / visits if visits else 0.0)
+                      for key, (visits, wins) in stats.items()}
+        named = (SQUARE_NAMES[move[0]], SQUARE_NAMES[move[1]])
+        return MCTSResult(named, move_stats[named][1], done, playouts, elapsed, move_stats)
+
+    def close(self):
+        """Shuts down the worker processes, if any."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_size = 0
+
+    def _reuse_tree(self, state):
+        """Makes the root the kept tree's node for state if it is the root itself, a child, or a grandchild, otherwise
+        a new empty node."""
+        if self._root is not None:
+            if self._root_state == state:
+                return
+            board = PlayoutBoard()
+            for child in self._root._children:
+                board.set_state(self._root_state)
+                board.apply(*child._move)
+                if board.get_state() == state:
+                    return self._set_root(child, state)
+                child_state = board.get_state()
+                for grandchild in child._children:
+                    board.set_state(child_state)
+                    board.apply(*grandchild._move)
+                    if board.get_state() == state:
+                        return self._set_root(grandchild, state)
+        self._set_root(_Node(None, state[2] ^ 1, None), state)
+
+    def _set_root(self, node, state):
+        """Makes node, whose position is state, the root of the kept tree, discarding the rest."""
+        node._parent = None
+        self._root = node
+        self._root_state = state
+
+
+def main(argv=None):
+    """Command line entry point. Searches a position and prints the chosen move and the search statistics. Returns
+    the exit status."""
+    parser = argparse.ArgumentParser(description="Monte-Carlo tree search for ChessVar.")
+    parser.add_argument('--position', help="get_position string to search (default: the start position)")
+    parser.add_argument('--iterations', type=int, default=None, help="iterations in all (default 1000)")
+    parser.add_argument('--time-limit', type=float, default=None, help="seconds to search")
+    parser.add_argument('--workers', type=int, default=1, help="processes to search in (default 1)")
+    parser.add_argument('--exploration', type=float, default=1.4, help="UCT exploration constant (default 1.4)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+    try:
+        game = ChessVar.from_position(args.position) if args.position else ChessVar()
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    player = MCTSPlayer(args.exploration, seed=args.seed)
+    try:
+        result = player.search(game, args.iterations, args.time_limit, args.workers)
+    finally:
+        player.close()
+    move = result.get_move()
+    print(f"move {move[0] + move[1] if move else None}  win rate {result.get_value():.3f}  "
+          f"iterations {result.get_iterations()}  playouts {result.get_playouts()}  {result.get_elapsed():.2f} s  "
+          f"{result.get_playouts_per_second():,.0f} playouts/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
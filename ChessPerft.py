@@ -0,0 +1,86 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Perft (performance test) for ChessVar move generation. Counts the leaf positions of the legal move tree
+#     to a given depth, reports nodes per second, and checks the counts against stored reference counts for the start
+#     position and a set of tactical positions. Run as a script, e.g. "python ChessPerft.py 4" or
+#     "python ChessPerft.py --suite".
+
+import argparse
+import sys
+import time
+
+from ChessVar import ChessVar
+
+# (name, moves played from the start position, {depth: leaf count}). Positions are stored as move lists so they are
+# reached through make_move itself. Counts were cross-checked against a separate string-based move generator.
+PERFT_SUITE = (
+    ('start', (), {1: 20, 2: 400, 3: 8902, 4: 197742}),
+    ('queen attacked by knight', ('e2e4', 'd7d5', 'e4d5', 'd8d5', 'b1c3'), {1: 47, 2: 1489, 3: 62849}),
+    ('open king diagonal', ('e2e4', 'f7f6', 'd1h5', 'g7g5'), {1: 39, 2: 730, 3: 27438}),
+    ('knights on f7 and f2', ('g1f3', 'g8f6', 'f3e5', 'f6e4', 'e5f7', 'e4f2'), {1: 24, 2: 542, 3: 13294}),
+    ('scholar setup', ('e2e4', 'e7e5', 'd1h5', 'b8c6', 'f1c4', 'g8f6'), {1: 43, 2: 1218, 3: 48265}),
+)
+
+
+def position_from_moves(moves):
+    """Returns a ChessVar after playing moves, each a four character string such as 'e2e4', from the start position.
+    Raises ValueError if a move is rejected."""
+    game = ChessVar()
+    rejected, _ = game.make_moves((move[:2], move[2:]) for move in moves)
+    if rejected is not None:
+        raise ValueError("illegal move in perft position: " + moves[rejected])
+    return game
+
+
+def run_perft(game, depth):
+    """Returns (leaf count, nodes per second) for a perft of depth from game's position."""
+    start = time.perf_counter()
+    nodes = game.perft(depth)
+    elapsed = time.perf_counter() - start
+    return nodes, nodes / elapsed if elapsed > 0 else 0.0
+
+
+def check_suite(max_depth=None, out=sys.stdout):
+    """Runs every stored reference count, up to max_depth if given, printing one line per count. Returns the list of
+    (name, depth, expected, actual) mismatches, which is empty when move generation agrees."""
+    failures = []
+    for name, moves, counts in PERFT_SUITE:
+        game = position_from_moves(moves)
+        for depth, expected in sorted(counts.items()):
+            if max_depth is not None and depth > max_depth:
+                continue
+            nodes, nps = run_perft(game, depth)
+            status = 'ok' if nodes == expected else 'MISMATCH (expected ' + str(expected) + ')'
+            print(f"{name:<28} depth {depth}  {nodes:>10}  {nps:>12,.0f} nodes/s  {status}", file=out)
+            if nodes != expected:
+                failures.append((name, depth, expected, nodes))
+    return failures
+
+
+def main(argv=None):
+    """Command line entry point. Returns the process exit status."""
+    parser = argparse.ArgumentParser(description="Perft node counts for ChessVar.")
+    parser.add_argument('depth', type=int, nargs='?', default=3, help="search depth in plies (default 3)")
+    parser.add_argument('--moves', nargs='*', default=(), help="moves from the start position, e.g. e2e4 e7e5")
+    parser.add_argument('--divide', action='store_true', help="print the count below each root move")
+    parser.add_argument('--suite', action='store_true', help="check the stored reference counts")
+    parser.add_argument('--max-depth', type=int, help="with --suite, skip reference counts deeper than this")
+    args = parser.parse_args(argv)
+
+    if args.suite:
+        failures = check_suite(args.max_depth)
+        print("all reference counts match" if not failures else str(len(failures)) + " mismatches")
+        return 1 if failures else 0
+
+    game = position_from_moves(args.moves)
+    if args.divide:
+        for (move_from, move_to), nodes in sorted(game.divide(args.depth).items()):
+            print(move_from + move_to + ": " + str(nodes))
+    nodes, nps = run_perft(game, args.depth)
+    print(f"depth {args.depth}: {nodes} nodes, {nps:,.0f} nodes/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
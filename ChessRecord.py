@@ -0,0 +1,243 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Compact binary game records for ChessVar. Includes class GameRecordWriter, which appends games to a
+#     record file, class GameRecorder, which hooks into a game's make_move and appends the game as soon as it is won,
+#     and class GameRecordReader, which memory-maps a record file and replays its games lazily, one at a time, so
+#     archives far larger than memory can be streamed.
+#
+#     File layout, all integers little-endian:
+#         header   magic b'CVGR', version (u16), reserved (u16), game count (u32), reserved (u32), index offset (u64)
+#         games    per game: move count (u16), result (u8), reserved (u8), then the moves packed two to three bytes
+#                  as 12-bit from * 64 + to values, the last byte pair padded with zero bits for an odd count
+#         index    game count u64 offsets, one per game, pointing at each game's move count
+#     Games start from the standard start position, so games set up with ChessVar.from_position cannot be recorded.
+#     Results are 0 unfinished, 1 white won, 2 black won.
+
+import mmap
+import struct
+
+from ChessVar import ChessVar, SQUARE_INDEX, SQUARE_NAMES
+
+MAGIC = b'CVGR'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIQ')
+GAME_HEADER = struct.Struct('<HBB')
+OFFSET = struct.Struct('<Q')
+RESULTS = ('UNFINISHED', 'WHITE_WON', 'BLACK_WON')
+MAX_MOVES = 0xFFFF
+
+
+def pack_moves(moves):
+    """Returns bytes holding (from_square, to_square) index pairs at 12 bits per move."""
+    packed = bytearray()
+    for index in range(0, len(moves), 2):
+        first = moves[index][0] << 6 | moves[index][1]
+        second = moves[index + 1][0] << 6 | moves[index + 1][1] if index + 1 < len(moves) else 0
+        packed += bytes((first >> 4, (first & 0xF) << 4 | second >> 8, second & 0xFF))
+    return bytes(packed)
+
+
+def unpack_moves(data, offset, count):
+    """Returns count (from_square, to_square) index pairs packed by pack_moves, read from data starting at offset."""
+    moves = []
+    for index in range(offset, offset + 3 * ((count + 1) // 2), 3):
+        first = data[index] << 4 | data[index + 1] >> 4
+        second = (data[index + 1] & 0xF) << 8 | data[index + 2]
+        moves.append((first >> 6, first & 0x3F))
+        moves.append((second >> 6, second & 0x3F))
+    return moves[:count]
+
+
+class GameRecordWriter:
+    """Represents a record file being written. Games are appended as they are added; the index and game count are
+    written on close. Usable as a context manager."""
+
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0))
+        self._offsets = []
+
+    def write_game(self, game):
+        """Appends a ChessVar game: every move made so far and its current game state. Raises ValueError if the game
+        did not start from the standard start position, as a game set up with from_position may not, since its record
+        would replay to a different game."""
+        _check_start(game)
+        self.write_moves(game.get_moves(), game.get_game_state())
+
+    def write_moves(self, moves, game_state='UNFINISHED'):
+        """Appends a game given as a list of pairs of algebraic squares, e.g. [('e2', 'e4'), ...], and its final game
+        state. Raises ValueError for an unknown square or more than 65535 moves."""
+        if len(moves) > MAX_MOVES:
+            raise ValueError("game too long for a record: " + str(len(moves)) + " moves")
+        try:
+            squares = [(SQUARE_INDEX[move_from], SQUARE_INDEX[move_to]) for move_from, move_to in moves]
+        except KeyError as error:
+            raise ValueError("not a square: " + str(error)) from None
+        self._write_squares(squares, game_state)
+
+    def record(self, game):
+        """Starts recording game as it is played and returns its GameRecorder, which appends the game to this file
+        once it is won or its finish method is called."""
+        return GameRecorder(self, game)
+
+    def _write_squares(self, squares, game_state):
+        """Appends a game given as (from_square, to_square) index pairs, at most MAX_MOVES of them."""
+        self._offsets.append(self._file.tell())
+        self._file.write(GAME_HEADER.pack(len(squares), RESULTS.index(game_state), 0))
+        self._file.write(pack_moves(squares))
+
+    def close(self):
+        """Writes the index and header and closes the file."""
+        if self._file.closed:
+            return
+        index_offset = self._file.tell()
+        for offset in self._offsets:
+            self._file.write(OFFSET.pack(offset))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, len(self._offsets), 0, index_offset))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameRecorder:
+    """Represents a game being recorded as it is played, through the listener of ChessVar's instrumentation (see
+    enable_instrumentation), so every way of making or taking back a move is seen: moves made are noted, moves taken
+    back are dropped, and the game is appended to the writer the moment it is won. A game abandoned unfinished is
+    appended by finish. Only the moves of the game in progress are held, as index pairs.
+
+    Recording turns the game's instrumentation on, replacing any listener it had, and turns it off once the game is
+    written."""
+
+    def __init__(self, writer, game):
+        _check_start(game)
+        self._writer = writer
+        self._game = game
+        self._moves = _square_moves(game)
+        self._finished = False
+        game.enable_instrumentation(self._on_event)
+        if game.get_game_state() != 'UNFINISHED':
+            self.finish()
+
+    def is_finished(self):
+        """Returns True once the game has been written."""
+        return self._finished
+
+    def finish(self):
+        """Appends the game as it stands, if it has not been written yet, and stops recording. Raises ValueError if the
+        game has grown past MAX_MOVES moves."""
+        if self._finished:
+            return
+        if len(self._moves) > MAX_MOVES:
+            raise ValueError("game too long for a record: " + str(len(self._moves)) + " moves")
+        self._finished = True
+        self._game.disable_instrumentation()
+        self._writer._write_squares(self._moves, self._game.get_game_state())
+
+    def _on_event(self, game, event, details):
+        """Instrumentation listener: follows the game's moves and writes it when it is won. A 'state' event may follow a
+        seek that jumped over moves without reporting them, so the moves are taken afresh from the game then."""
+        if event == 'move':
+            self._moves.append((SQUARE_INDEX[details['from']], SQUARE_INDEX[details['to']]))
+        elif event == 'unmake':
+            self._moves.pop()
+        elif event == 'state':
+            self._moves = _square_moves(game)
+            if details['state'] != 'UNFINISHED':
+                self.finish()
+
+
+def _square_moves(game):
+    """Returns game's moves so far as (from_square, to_square) index pairs."""
+    return [(SQUARE_INDEX[move_from], SQUARE_INDEX[move_to]) for move_from, move_to in game.get_moves()]
+
+
+def _check_start(game):
+    """Raises ValueError unless game's moves, replayed from the standard start position, give its current position
+    and game state, as they do for every game not set up with ChessVar.from_position."""
+    replayed = ChessVar()
+    rejected, game_state = replayed.make_moves(game.get_moves())
+    if rejected is not None or game_state != game.get_game_state() or \
+            replayed.get_position() != game.get_position():
+        raise ValueError("only games played from the standard start position can be recorded")
+
+
+class GameRecordReader:
+    """Represents a record file opened for reading through a memory map. Nothing is decoded until a game is asked for,
+    so opening and iterating a multi-gigabyte archive uses almost no memory. Usable as a context manager."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, self._count, _, self._index_offset = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("not a ChessVar game record: " + str(path))
+
+    def __len__(self):
+        return self._count
+
+    def get_result(self, number):
+        """Returns the final game state of game number, as 'UNFINISHED', 'WHITE_WON', or 'BLACK_WON'."""
+        return RESULTS[GAME_HEADER.unpack_from(self._data, self._game_offset(number))[1]]
+
+    def get_square_moves(self, number):
+        """Returns the moves of game number as (from_square, to_square) index pairs."""
+        offset = self._game_offset(number)
+        count = GAME_HEADER.unpack_from(self._data, offset)[0]
+        return unpack_moves(self._data, offset + GAME_HEADER.size, count)
+
+    def get_moves(self, number):
+        """Returns the moves of game number as pairs of algebraic squares."""
+        return [(SQUARE_NAMES[move_from], SQUARE_NAMES[move_to]) for move_from, move_to in
+                self.get_square_moves(number)]
+
+    def games(self):
+        """Yields (moves, result) for every game in file order, moves as pairs of algebraic squares."""
+        for number in range(self._count):
+            yield self.get_moves(number), self.get_result(number)
+
+    def replay(self, number, verify=False):
+        """Returns a ChessVar with game number played out. With verify, every move goes through the same legality
+        checks as make_move and a ValueError names the first one rejected; otherwise moves are made unchecked. Either
+        way the game keeps its history checkpoints, so seek is as fast on it as on a game played move by move."""
+        game = None
+        for game in self.positions(number, verify):
+            pass
+        return game
+
+    def positions(self, number, verify=False):
+        """Yields game number's ChessVar at the start and after each move, as replay does. The same game object is
+        yielded each time, moved on by one move, so nothing is copied."""
+        game = ChessVar()
+        yield game
+        for ply, (move_from, move_to) in enumerate(self.get_square_moves(number)):
+            if verify:
+                if not game._make_square_move(move_from, move_to):
+                    raise ValueError("game " + str(number) + " ply " + str(ply + 1) + ": illegal move " +
+                                     SQUARE_NAMES[move_from] + SQUARE_NAMES[move_to])
+            else:
+                game._replay_move(move_from, move_to)
+            yield game
+
+    def close(self):
+        """Unmaps and closes the file."""
+        self._data.close()
+        self._file.close()
+
+    def _game_offset(self, number):
+        """Returns the file offset of game number, read from the index."""
+        if not 0 <= number < self._count:
+            raise IndexError("game number out of range: " + str(number))
+        return OFFSET.unpack_from(self._data, self._index_offset + OFFSET.size * number)[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
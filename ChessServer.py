@@ -0,0 +1,347 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: asyncio game server hosting many concurrent ChessVar games, and a load generator to measure it. Clients
+#     send one JSON object per line over TCP or a Unix socket and get one JSON line back per request. Engine moves run
+#     in a process pool so they never block the event loop, and games left idle are evicted. Run as a script, e.g.
+#     "python ChessServer.py serve --port 8765" and "python ChessServer.py load --port 8765 --games 10000".
+#
+#     Requests are {"op": ..., "game": game id, ...} with an optional "id" echoed in the reply. Replies are
+#     {"ok": true, "result": ...} or {"ok": false, "error": message}; a request line longer than 64 KiB gets an error
+#     reply and is skipped, and a request that fails inside the server gets an error reply and is logged to stderr,
+#     the connection staying open either way. Operations:
+#         new                                    starts a game, result is its game id
+#         make_move       from, to               result is make_move's True or False
+#         get_game_state, get_turn, get_position, legal_moves
+#         engine_move     depth, time_limit      engine plays for the active player, result is the move or null;
+#                                                depth 1 to the server's max_depth (MAX_ENGINE_DEPTH by default)
+#         close                                  ends the session
+#         stats                                  server-wide counters
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ChessVar import ChessVar
+
+MAX_ENGINE_DEPTH = 6  # Deepest engine_move search a client may ask for by default; each ply multiplies the work.
+
+
+async def _read_line(reader):
+    """Returns the next line from reader, b'' at the end of the stream, or None for a line longer than the reader's
+    limit, which is read and thrown away so the next call starts at the line after it."""
+    try:
+        return await reader.readuntil(b'\n')
+    except asyncio.IncompleteReadError as error:
+        return error.partial  # A last line without a newline, or b''.
+    except asyncio.LimitOverrunError as error:
+        consumed = error.consumed
+    while True:
+        await reader.readexactly(consumed)
+        try:
+            await reader.readuntil(b'\n')
+            return None
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError as error:
+            consumed = error.consumed
+
+
+def _engine_move(position, depth, time_limit):
+    """Returns the engine's move for a get_position string as a pair of algebraic squares. Runs in a worker process."""
+    return ChessVar.from_position(position).best_move(depth, time_limit)
+
+
+class Session:
+    """Represents one hosted game: the ChessVar, a lock so requests to the game run one at a time, and when it was last
+    used."""
+
+    def __init__(self):
+        self._game = ChessVar()
+        self._lock = asyncio.Lock()
+        self._last_used = time.monotonic()
+
+    def get_game(self):
+        """Returns the game."""
+        return self._game
+
+    def get_lock(self):
+        """Returns the lock."""
+        return self._lock
+
+    def get_last_used(self):
+        """Returns the time.monotonic() value of the last request."""
+        return self._last_used
+
+    def touch(self):
+        """Marks the session as used now."""
+        self._last_used = time.monotonic()
+
+
+class GameServer:
+    """Represents the server: a table of sessions by game id, a process pool for engine moves, and the connection
+    handlers. At most engine_jobs engine searches run at once, twice the engine workers by default; further engine
+    requests wait their turn, which holds back only the connections that asked for them. Engine requests deeper than
+    max_depth are refused."""
+
+    def __init__(self, idle_timeout=600.0, max_sessions=100000, engine_workers=None, engine_jobs=None,
+                 max_depth=MAX_ENGINE_DEPTH):
+        self._sessions = {}  # {game id: Session}
+        self._next_id = 1
+        self._idle_timeout = idle_timeout
+        self._max_sessions = max_sessions
+        self._engine_workers = engine_workers or os.cpu_count() or 1
+        self._engine_jobs = engine_jobs or 2 * self._engine_workers
+        self._max_depth = max_depth
+        self._pool = None
+        self._engine_slots = None
+        self._servers = []
+        self._evictor = None
+        self._requests = 0
+        self._evicted = 0
+
+    async def start(self, host='127.0.0.1', port=8765, unix_path=None):
+        """Starts listening on a Unix socket if unix_path is given, otherwise on TCP host and port, and starts the idle
+        evictor. Returns the asyncio server."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self._engine_workers)
+            self._engine_slots = asyncio.Semaphore(self._engine_jobs)
+            self._evictor = asyncio.create_task(self._evict_idle())
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self._handle_connection, unix_path)
+        else:
+            server = await asyncio.start_server(self._handle_connection, host, port)
+        self._servers.append(server)
+        return server
+
+    async def close(self):
+        """Stops listening, stops the evictor, and shuts down the engine pool."""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        if self._evictor is not None:
+            self._evictor.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    async def _handle_connection(self, reader, writer):
+        """Answers requests from one client, in order, until it disconnects. Waiting for each reply to drain before
+        reading the next request keeps a slow client from piling up work."""
+        try:
+            while True:
+                line = await _read_line(reader)
+                if line == b'':
+                    break
+                try:
+                    if line is None:
+                        raise ValueError("request line too long")
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                except ValueError as error:
+                    reply = {'ok': False, 'error': "bad request: " + str(error)}
+                else:
+                    reply = await self.handle_request(request)
+                writer.write(json.dumps(reply).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle_request(self, request):
+        """Returns the reply dictionary for one request dictionary. A failure that is not the request's fault is
+        logged to stderr with its traceback and answered with an 'internal error' reply."""
+        self._requests += 1
+        reply = {'id': request['id']} if 'id' in request else {}
+        try:
+            reply['result'] = await self._dispatch(request)
+            reply['ok'] = True
+        except (KeyError, ValueError, TypeError) as error:
+            reply['ok'] = False
+            reply['error'] = str(error.args[0]) if error.args else type(error).__name__
+        except Exception as error:
+            print("error handling request " + json.dumps(request)[:200], file=sys.stderr)
+            traceback.print_exc()
+            reply['ok'] = False
+            reply['error'] = "internal error: " + type(error).__name__
+        return reply
+
+    async def _dispatch(self, request):
+        """Carries out one request and returns its result. Raises KeyError, ValueError, or TypeError for bad ones."""
+        operation = request.get('op')
+        if operation == 'new':
+            if len(self._sessions) >= self._max_sessions:
+                raise ValueError("server full")
+            game_id = self._next_id
+            self._next_id += 1
+            self._sessions[game_id] = Session()
+            return game_id
+        if operation == 'stats':
+            return {'sessions': len(self._sessions), 'requests': self._requests, 'evicted': self._evicted}
+
+        session = self._sessions.get(request.get('game'))
+        if session is None:
+            raise KeyError("no such game: " + str(request.get('game')))
+        session.touch()
+        game = session.get_game()
+        if operation == 'close':
+            del self._sessions[request['game']]
+            return True
+        async with session.get_lock():
+            if operation == 'make_move':
+                return game.make_move(str(request['from']), str(request['to']))
+            if operation == 'get_game_state':
+                return game.get_game_state()
+            if operation == 'get_turn':
+                return game.get_turn()
+            if operation == 'get_position':
+                return game.get_position()
+            if operation == 'legal_moves':
+                return [move_from + move_to for move_from, move_to in game.legal_moves()]
+            if operation == 'engine_move':
+                depth = int(request.get('depth', 3))
+                if not 1 <= depth <= self._max_depth:
+                    raise ValueError("depth must be between 1 and " + str(self._max_depth))
+                if game.get_game_state() != 'UNFINISHED':
+                    return None
+                async with self._engine_slots:
+                    pool = self._pool
+                    try:
+                        move = await asyncio.get_running_loop().run_in_executor(
+                            pool, _engine_move, game.get_position(), depth,
+                            request.get('time_limit'))
+                    except BrokenProcessPool:
+                        self._replace_pool(pool)
+                        raise
+                if move is None:
+                    return None
+                game.make_move(*move)
+                return move[0] + move[1]
+        raise ValueError("unknown op: " + str(operation))
+
+    def _replace_pool(self, pool):
+        """Replaces the engine pool with a new one if it is still pool, which a worker process died in, so that later
+        engine requests can succeed. Requests that were waiting on the old pool fail."""
+        if self._pool is pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = ProcessPoolExecutor(max_workers=self._engine_workers)
+
+    async def _evict_idle(self):
+        """Every few seconds, drops sessions that have had no request for idle_timeout seconds."""
+        while True:
+            await asyncio.sleep(min(self._idle_timeout, 5.0))
+            cutoff = time.monotonic() - self._idle_timeout
+            for game_id in [game_id for game_id, session in self._sessions.items()
+                            if session.get_last_used() < cutoff and not session.get_lock().locked()]:
+                del self._sessions[game_id]
+                self._evicted += 1
+
+
+async def run_load(host='127.0.0.1', port=8765, unix_path=None, games=1000, connections=10, plies=40, seed=0):
+    """Load generator. Opens connections clients that between them start games games, keep them all open at once, and
+    play random moves in each until it ends or reaches plies plies. Returns a dictionary of request count, requests
+    per second, and latency percentiles in milliseconds. Each client waits for every reply before sending its next
+    request, so connections is the number of requests in flight and sets how hard the server is pushed."""
+    latencies = []
+
+    async def client(number, game_count):
+        if unix_path is not None:
+            reader, writer = await asyncio.open_unix_connection(unix_path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        generator = random.Random(seed * 100003 + number)
+
+        async def call(request):
+            start = time.perf_counter()
+            writer.write(json.dumps(request).encode() + b'\n')
+            await writer.drain()
+            reply = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            if not reply['ok']:
+                raise RuntimeError(reply['error'])
+            return reply['result']
+
+        game_ids = [await call({'op': 'new'}) for _ in range(game_count)]
+        for _ in range(plies):
+            playing = []
+            for game_id in game_ids:
+                moves = await call({'op': 'legal_moves', 'game': game_id})
+                if moves:
+                    move = generator.choice(moves)
+                    await call({'op': 'make_move', 'game': game_id, 'from': move[:2], 'to': move[2:]})
+                    playing.append(game_id)
+                else:
+                    await call({'op': 'close', 'game': game_id})
+            game_ids = playing
+        for game_id in game_ids:
+            await call({'op': 'close', 'game': game_id})
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number, games // connections + (number < games % connections))
+                           for number in range(connections)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(fraction):
+        return 1000 * latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] if latencies else 0.0
+
+    return {'requests': len(latencies), 'requests_per_second': len(latencies) / elapsed,
+            'p50_ms': percentile(0.50), 'p99_ms': percentile(0.99), 'max_ms': percentile(1.0)}
+
+
+async def _serve(args):
+    """Runs the server until interrupted."""
+    server = GameServer(args.idle_timeout, args.max_sessions, args.engine_workers, max_depth=args.max_depth)
+    await server.start(args.host, args.port, args.unix)
+    print("listening on " + (args.unix or args.host + ':' + str(args.port)), file=sys.stderr)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    """Command line entry point. Returns the exit status."""
+    parser = argparse.ArgumentParser(description="ChessVar game server and load generator.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name in ('serve', 'load'):
+        command = commands.add_parser(name)
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--port', type=int, default=8765)
+        command.add_argument('--unix', help="Unix socket path to use instead of TCP")
+    serve = commands.choices['serve']
+    serve.add_argument('--idle-timeout', type=float, default=600.0, help="seconds before an idle game is dropped")
+    serve.add_argument('--max-sessions', type=int, default=100000)
+    serve.add_argument('--engine-workers', type=int, default=None, help="engine processes (default: one per CPU)")
+    serve.add_argument('--max-depth', type=int, default=MAX_ENGINE_DEPTH,
+                       help="deepest engine_move search allowed (default " + str(MAX_ENGINE_DEPTH) + ")")
+    load = commands.choices['load']
+    load.add_argument('--games', type=int, default=1000, help="games held open at once")
+    load.add_argument('--connections', type=int, default=10)
+    load.add_argument('--plies', type=int, default=40, help="moves to play in each game")
+    load.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(_serve(args))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    report = asyncio.run(run_load(args.host, args.port, args.unix, args.games, args.connections, args.plies,
+                                  args.seed))
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,392 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Endgame tablebases for ChessVar. Solves small endgames by retrograde analysis, stores the result for
+#     every position in a compact directly indexed file, and probes those files through a memory map, opening each one
+#     only when a position with its material is first probed. Includes class Tablebase for probing and move choice, and
+#     generate_tables, which builds tables in parallel. Generation requires NumPy; probing does not. Run as a script,
+#     e.g. "python ChessTablebase.py --directory tables KvK KNvK KNvKB". ChessCheck's tablebase check tests the tables.
+#
+#     A material set such as 'KNvKB' names white's pieces, then black's, at most one piece of each type per side. Every
+#     piece is then the last of its type, so whoever captures anything wins at once. Such positions only arise from
+#     ChessVar.from_position(position, absent_types_lose=False), where the types not on the board are out of play.
+#     Tables score positions for the side to move: won in n plies, lost in n plies, or drawn, which covers a side left
+#     without a legal move and play that can go on forever.
+#
+#     File layout, all integers little-endian:
+#         header   magic b'CVTB', version (u16), piece count (u16), material (16 bytes, ASCII, zero padded),
+#                  longest win or loss in plies (u16), reserved (u16)
+#         values   one signed byte per position: n > 0 won in n plies, -n lost in n plies, 0 drawn or impossible
+#     Positions are numbered side * 64 ** k + s1 * 64 ** (k - 1) + ... + sk, side 0 for white to move, and s1 to sk the
+#     squares of the k pieces, white's then black's, each in PIECE_NAMES order.
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ChessVar import PIECE_LETTERS, PIECE_NAMES, SQUARE_NAMES, iter_squares
+
+MAGIC = b'CVTB'
+VERSION = 1
+HEADER = struct.Struct('<4sHH16sHH')
+SUFFIX = '.cvtb'
+MAX_PIECES = 4  # A table holds 2 * 64 ** pieces bytes; five pieces would take 2 GB.
+MAX_DISTANCE = 127  # Longest win or loss a signed byte can hold.
+NAMES_BY_LETTER = {letter.upper(): name for name, letter in PIECE_LETTERS.items()}
+SLIDER_DIRECTIONS = {'queen': ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)),
+                     'rook': ((0, 1), (0, -1), (1, 0), (-1, 0)),
+                     'bishop': ((1, 1), (1, -1), (-1, 1), (-1, -1))}
+STEPS = {'king': ((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (1, -1), (-1, 1), (-1, -1)),
+         'knight': ((1, 2), (-1, 2), (1, -2), (-1, -2), (2, 1), (-2, 1), (2, -1), (-2, -1))}
+
+
+def parse_material(material):
+    """Returns the pieces of a material set such as 'KNvKB' as a list of (color, name), white's then black's, each in
+    PIECE_NAMES order. Raises ValueError unless each side has one to MAX_PIECES pieces, at most one of each type."""
+    sides = material.upper().split('V')
+    if len(sides) != 2 or not all(sides):
+        raise ValueError("material must look like 'KNvKB': " + repr(material))
+    pieces = []
+    for color, letters in zip(('white', 'black'), sides):
+        if any(letter not in NAMES_BY_LETTER for letter in letters) or len(set(letters)) != len(letters):
+            raise ValueError("unknown or repeated piece in material " + repr(material))
+        names = sorted((NAMES_BY_LETTER[letter] for letter in letters), key=PIECE_NAMES.index)
+        pieces += [(color, name) for name in names]
+    if len(pieces) > MAX_PIECES:
+        raise ValueError("at most " + str(MAX_PIECES) + " pieces per table: " + repr(material))
+    return pieces
+
+
+def material_name(pieces):
+    """Returns the canonical material set name, e.g. 'KNvKB', for a list of (color, name) pairs."""
+    return 'v'.join(''.join(PIECE_LETTERS[name].upper() for name in sorted(
+        (name for piece_color, name in pieces if piece_color == color), key=PIECE_NAMES.index))
+        for color in ('white', 'black'))
+
+
+def _rays(color, name, captures=False):
+    """Returns the piece's lines of movement from every square as a list of rays, each ray a list of 64-entry lists
+    giving the square reached at each distance from each starting square, or -1 where that is off the board. The piece
+    may go on along a ray only while the squares passed over are empty. For pawns, captures selects the diagonal
+    captures instead of the pushes."""
+    def target(square, rank_step, file_step):
+        rank, file = divmod(square, 8)
+        rank, file = rank + rank_step, file + file_step
+        return 8 * rank + file if 0 <= rank <= 7 and 0 <= file <= 7 else -1
+
+    if name == 'pawn':
+        forward = 1 if color == 'white' else -1
+        start_rank = 1 if color == 'white' else 6
+        if captures:
+            return [[[target(square, forward, file_step) for square in range(64)]] for file_step in (1, -1)]
+        return [[[target(square, forward, 0) for square in range(64)],
+                 [target(square, 2 * forward, 0) if square // 8 == start_rank else -1 for square in range(64)]]]
+    if name in STEPS:
+        return [[[target(square, *step) for square in range(64)]] for step in STEPS[name]]
+    return [[[target(square, rank_step * distance, file_step * distance) for square in range(64)]
+             for distance in range(1, 8)] for rank_step, file_step in SLIDER_DIRECTIONS[name]]
+
+
+class _Generator:
+    """Represents the retrograde analysis of one material set on NumPy boolean arrays of shape (64,) * k, one axis per
+    piece, with one array per side to move. A piece stepping from each square f to f + delta is a shift of an array
+    along that piece's axis, so every move of every position is handled by a few whole-array slice copies per step
+    of each ray. Moves are worked out with the moving piece's axis in front, where a shift is one block copy, and the
+    last axis packed eight positions to a byte."""
+
+    def __init__(self, pieces):
+        import numpy as np  # Only generation needs NumPy.
+        self._np = np
+        self._pieces = pieces
+        self._count = len(pieces)
+        self._shape = (64,) * self._count
+        squares = np.arange(64)
+        self._valid = np.ones(self._shape, dtype=bool)  # No two pieces on one square.
+        for first in range(self._count):
+            for second in range(first + 1, self._count):
+                self._valid &= ~self._same_square(first, second, squares)
+        self._leading_valid = [self._leading(self._valid, axis) for axis in range(self._count)]
+
+    def _same_square(self, axis, other, squares):
+        """Returns the boolean array of whether piece other stands on squares[f], f being the square of piece axis."""
+        np = self._np
+        shape = [1] * self._count
+        shape[axis] = shape[other] = 64
+        matrix = np.asarray(squares)[:, None] == np.arange(64)[None, :]  # [square of axis, square of other]
+        return np.broadcast_to(matrix.reshape(shape) if axis < other else matrix.T.reshape(shape), self._shape)
+
+    def _steps(self, color, name, captures=False):
+        """Returns _rays for the piece as rays of (delta, cut) steps: the step takes each square f to f + delta, except
+        the squares in cut, from which it would leave the board."""
+        rays = []
+        for ray in _rays(color, name, captures):
+            steps = []
+            for targets in ray:
+                delta = next(target - square for square, target in enumerate(targets) if target >= 0)
+                steps.append((delta, [square for square, target in enumerate(targets) if target < 0]))
+            rays.append(steps)
+        return rays
+
+    def _leading(self, array, axis):
+        """Returns boolean array with piece axis's axis moved to the front and the last axis packed into bits."""
+        return self._np.packbits(self._np.moveaxis(array, axis, 0), axis=-1)
+
+    def _unleading(self, packed, axis):
+        """Returns the boolean array _leading packed, back in the usual axis order."""
+        return self._np.moveaxis(self._np.unpackbits(packed, axis=-1).view(bool), 0, axis)
+
+    def _shift(self, array, step):
+        """Returns the array whose entry for the piece on the leading axis on square f is array's entry for it on
+        f + delta, and False where that is off the board."""
+        delta, cut = step
+        first, last = max(0, -delta), min(64, 64 - delta)
+        shifted = self._np.empty_like(array)
+        shifted[:first] = 0
+        shifted[last:] = 0
+        shifted[first:last] = array[first + delta:last + delta]
+        for square in cut:
+            shifted[square] = 0
+        return shifted
+
+    def can_capture(self, color):
+        """Returns the positions where color, to move, can capture a piece."""
+        np = self._np
+        result = np.zeros(self._shape, dtype=bool)
+        squares = np.arange(64)
+        enemies = [other for other, (piece_color, _) in enumerate(self._pieces) if piece_color != color]
+        for axis, (piece_color, name) in enumerate(self._pieces):
+            if piece_color != color:
+                continue
+            valid = self._leading_valid[axis]
+            meets = [self._leading(self._same_square(axis, other, squares), axis) for other in enemies]
+            captures = np.zeros_like(valid)
+            for ray in self._steps(color, name, captures=True):
+                clear = None  # Positions whose path is empty so far; None before the first step.
+                for step in ray:
+                    hit = np.zeros_like(valid)
+                    for meet in meets:
+                        hit |= self._shift(meet, step)
+                    if clear is not None:
+                        hit &= clear
+                    captures |= hit
+                    empty = self._shift(valid, step)
+                    if clear is not None:
+                        empty &= clear
+                    clear = empty
+            result |= self._unleading(captures, axis)
+        return result & self._valid
+
+    def quiet_move_to(self, color, targets):
+        """Returns the positions where color, to move, has a non-capturing move to a position in targets, a boolean
+        array of valid positions with the other side to move."""
+        np = self._np
+        result = np.zeros(self._shape, dtype=bool)
+        for axis, (piece_color, name) in enumerate(self._pieces):
+            if piece_color != color:
+                continue
+            valid = self._leading_valid[axis]
+            leading_targets = self._leading(targets, axis)
+            moves = np.zeros_like(valid)
+            for ray in self._steps(color, name):
+                clear = None  # Positions whose path is empty so far; None before the first step.
+                for index, step in enumerate(ray):
+                    # A target position is valid, so the square moved to is known to be empty.
+                    moved = self._shift(leading_targets, step)
+                    if clear is not None:
+                        moved &= clear
+                    moves |= moved
+                    if index + 1 < len(ray):
+                        empty = self._shift(valid, step)
+                        if clear is not None:
+                            empty &= clear
+                        clear = empty
+            result |= self._unleading(moves, axis)
+        return result & self._valid
+
+    def solve(self):
+        """Returns the (2,) + shape int8 array of results for white and black to move, and the longest win or loss.
+        Raises ValueError if a result does not fit in a signed byte."""
+        np = self._np
+        colors = ('white', 'black')
+        results = [np.zeros(self._shape, dtype=np.int8) for _ in colors]
+        has_move = []
+        for side, color in enumerate(colors):
+            results[side][self._valid & self.can_capture(color)] = 1
+            has_move.append(self.quiet_move_to(color, self._valid))
+        plies = 1
+        quiet_plies = 0
+        while quiet_plies < 2:
+            plies += 1
+            if plies > MAX_DISTANCE:
+                raise ValueError("results longer than " + str(MAX_DISTANCE) + " plies")
+            changed = False
+            new_results = []
+            for side, color in enumerate(colors):
+                undecided = self._valid & (results[side] == 0)
+                other = results[1 - side]
+                if plies % 2:
+                    # Won: some move leaves the opponent lost.
+                    decided = undecided & self.quiet_move_to(color, other < 0)
+                else:
+                    # Lost: there are moves, and every one leaves the opponent won.
+                    decided = undecided & has_move[side] & ~self.quiet_move_to(color, self._valid & (other <= 0))
+                new_results.append(decided)
+                changed |= bool(decided.any())
+            for side, decided in enumerate(new_results):
+                results[side][decided] = plies if plies % 2 else -plies
+            quiet_plies = 0 if changed else quiet_plies + 1
+        longest = max(int(np.abs(result).max()) for result in results)
+        return np.stack(results), longest
+
+
+def generate_table(material, directory='.'):
+    """Solves material set material and writes its table to directory. Returns (material name, path, longest result in
+    plies, seconds taken)."""
+    start = time.perf_counter()
+    pieces = parse_material(material)
+    name = material_name(pieces)
+    results, longest = _Generator(pieces).solve()
+    path = os.path.join(directory, name + SUFFIX)
+    with open(path + '.tmp', 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(pieces), name.encode(), longest, 0))
+        file.write(results.tobytes())
+    os.replace(path + '.tmp', path)
+    return name, path, longest, time.perf_counter() - start
+
+
+def generate_tables(materials, directory='.', workers=None):
+    """Solves each material set in materials, one per worker process at a time (one per CPU by default), and yields
+    generate_table's result for each as it finishes. With workers=1 they are solved in this process."""
+    os.makedirs(directory, exist_ok=True)
+    for material in materials:
+        parse_material(material)  # Reject bad names before starting any work.
+    if workers == 1:
+        for material in materials:
+            yield generate_table(material, directory)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(generate_table, materials, [directory] * len(materials)):
+            yield result
+
+
+class Tablebase:
+    """Represents a directory of tables. Each table is opened and memory-mapped the first time a position with its
+    material is probed, and only the bytes probed are ever read from disk."""
+
+    def __init__(self, directory='.'):
+        self._directory = directory
+        self._tables = {}  # {material name: (mmap, file) or None if there is no such table}
+
+    def get_max_pieces(self):
+        """Returns the most pieces any table can cover."""
+        return MAX_PIECES
+
+    def probe(self, game):
+        """Returns (result, plies) for game's position, result being 'win', 'loss', or 'draw' for the player to move and
+        plies the number of plies to the winning capture (0 for a draw). Returns None if the game is over, if some
+        piece on the board is not the last of its type, or if there is no table for the material."""
+        if game._game_state != 'UNFINISHED':
+            return None
+        occupancy = game._color_bitboards['white'] | game._color_bitboards['black']
+        if occupancy.bit_count() > MAX_PIECES:
+            return None
+        squares = []  # [(color, name, square)]
+        for square in iter_squares(occupancy):
+            piece = game._board[square]
+            counts = game._white_pieces if piece.get_color() == 'white' else game._black_pieces
+            if counts[piece.get_name()] != 1:
+                return None
+            squares.append((piece.get_color(), piece.get_name(), square))
+        pieces = [(color, name) for color, name, _ in squares]
+        if len(set(pieces)) != len(pieces):
+            return None
+        table = self._table(material_name(pieces))
+        if table is None:
+            return None
+        squares.sort(key=lambda entry: (entry[0] != 'white', PIECE_NAMES.index(entry[1])))
+        index = 0 if game._active_player == 'white' else 1
+        for _, _, square in squares:
+            index = index * 64 + square
+        value = table[HEADER.size + index]
+        value = value - 256 if value > 127 else value
+        if value > 0:
+            return 'win', value
+        if value < 0:
+            return 'loss', -value
+        return 'draw', 0
+
+    def best_move(self, game):
+        """Returns the best move in game's position as a pair of algebraic squares, or None if the position is not in
+        the tablebase or the player to move has no legal move: the quickest win, else a draw, else the slowest loss."""
+        if self.probe(game) is None:
+            return None
+        enemy = game._color_bitboards['black' if game._active_player == 'white' else 'white']
+        best, best_rank = None, None
+        for from_square, to_square in game._square_moves():
+            if enemy >> to_square & 1:
+                return SQUARE_NAMES[from_square], SQUARE_NAMES[to_square]  # Every capture wins at once.
+            game._apply_move(from_square, to_square)
+            result, plies = self.probe(game)
+            game._undo_move()
+            # The reply's result is from the opponent's point of view; smaller ranks are better here.
+            rank = (0, plies) if result == 'loss' else (1, 0) if result == 'draw' else (2, -plies)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = (from_square, to_square), rank
+        return None if best is None else (SQUARE_NAMES[best[0]], SQUARE_NAMES[best[1]])
+
+    def close(self):
+        """Unmaps and closes every open table."""
+        for table in self._tables.values():
+            if table is not None:
+                table[0].close()
+                table[1].close()
+        self._tables = {}
+
+    def _table(self, name):
+        """Returns the memory map of table name, opening it on first use, or None if there is no such table."""
+        if name not in self._tables:
+            path = os.path.join(self._directory, name + SUFFIX)
+            if not os.path.exists(path):
+                self._tables[name] = None
+            else:
+                file = open(path, 'rb')
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, count, material, _, _ = HEADER.unpack_from(data, 0)
+                if magic != MAGIC or version != VERSION or material.rstrip(b'\0').decode() != name or \
+                        len(data) != HEADER.size + 2 * 64 ** count:
+                    data.close()
+                    file.close()
+                    raise ValueError("not a ChessVar tablebase for " + name + ": " + path)
+                self._tables[name] = (data, file)
+        table = self._tables[name]
+        return None if table is None else table[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    """Command line entry point. Generates the tables named on the command line. Returns the exit status."""
+    parser = argparse.ArgumentParser(description="Generate ChessVar endgame tablebases.")
+    parser.add_argument('materials', nargs='+', help="material sets such as KvK, KNvK, or KNvKB")
+    parser.add_argument('--directory', default='.', help="where to write the tables (default: current directory)")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+    try:
+        for name, path, longest, seconds in generate_tables(args.materials, args.directory, args.workers):
+            print(f"{name:<8} longest {longest:>3} plies  {seconds:8.1f} s  {path}")
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
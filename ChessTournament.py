@@ -0,0 +1,133 @@
+# Author: Ian Bubier
+# GitHub username: IanBubier
+# Date: 10/18/2026
+# Description: Self-play tournament runner for ChessVar. Plays many games between two player configurations, spread
+#     across a pool of worker processes, and yields each result as soon as its game finishes. Every game is seeded, so
+#     any single game can be replayed exactly. Run as a script, e.g.
+#     "python ChessTournament.py --games 1000 --white engine:depth=2 --black random".
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from ChessMCTS import MCTSPlayer
+from ChessVar import ChessVar
+
+
+def parse_player(text):
+    """Returns a player configuration dictionary from a command line spec such as 'random',
+    'engine:depth=3,time_limit=0.5', or 'mcts:iterations=2000,exploration=1.4'."""
+    kind, _, options = text.partition(':')
+    if kind not in ('random', 'engine', 'mcts'):
+        raise ValueError("unknown player type: " + kind)
+    config = {'type': kind}
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        config[key] = float(value) if '.' in value else int(value)
+    return config
+
+
+def choose_move(game, config, generator, player=None):
+    """Returns the move player config chooses in game's position as a pair of algebraic squares. Random players use
+    generator so that a seeded game always plays out the same way. An MCTS player searches with player, an MCTSPlayer
+    kept for the whole game so its tree carries over from move to move, or with a new one if None. Returns None if
+    there is no legal move."""
+    if config['type'] == 'random':
+        moves = list(game.legal_moves())
+        return generator.choice(moves) if moves else None
+    if config['type'] == 'mcts':
+        if player is None:
+            player = MCTSPlayer(config.get('exploration', 1.4), seed=generator.getrandbits(64))
+        return player.best_move(game, config.get('iterations'), config.get('time_limit'))
+    return game.best_move(config.get('depth', 2), config.get('time_limit'))
+
+
+def play_game(seed, white, black, max_turns=200, opening_plies=4):
+    """Plays one game between player configurations white and black and returns a result dictionary with 'seed',
+    'winner' ('white', 'black', or None for a draw), 'turns' (from get_turn), and 'moves' (['e2e4', ...]).
+
+    The first opening_plies moves are random for both sides so that engine-vs-engine games differ between seeds. A
+    game still unfinished after max_turns turns, or where the player to move has no legal move, is a draw. Games with
+    no time limits are fully determined by their seed."""
+    generator = random.Random(seed)
+    game = ChessVar()
+    moves = []
+    # One MCTSPlayer per MCTS side for the whole game, so that each keeps its search tree between its moves.
+    players = [MCTSPlayer(config.get('exploration', 1.4), seed=generator.getrandbits(64))
+               if config['type'] == 'mcts' else None for config in (white, black)]
+    while game.get_game_state() == 'UNFINISHED' and game.get_turn() <= max_turns:
+        config = white if len(moves) % 2 == 0 else black
+        if len(moves) < opening_plies:
+            config = {'type': 'random'}
+        move = choose_move(game, config, generator, players[len(moves) % 2])
+        if move is None:
+            break
+        game.make_move(*move)
+        moves.append(move[0] + move[1])
+    winner = {'WHITE_WON': 'white', 'BLACK_WON': 'black'}.get(game.get_game_state())
+    return {'seed': seed, 'winner': winner, 'turns': game.get_turn(), 'moves': moves}
+
+
+def run_tournament(games, white, black, seed=0, workers=None, max_turns=200, opening_plies=4):
+    """Plays games games, seeded seed, seed + 1, ..., and yields each result dictionary (see play_game) as soon as it
+    finishes, so results arrive in completion order rather than seed order. Games are shared among workers processes,
+    one per CPU by default; with workers=1 they are played in this process. At most a few games per worker are queued
+    at once, so memory stays flat however many games are requested."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for game_seed in range(seed, seed + games):
+            yield play_game(game_seed, white, black, max_turns, opening_plies)
+        return
+    seeds = iter(range(seed, seed + games))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+
+        def submit_next():
+            game_seed = next(seeds, None)
+            if game_seed is not None:
+                pending.add(executor.submit(play_game, game_seed, white, black, max_turns, opening_plies))
+
+        for _ in range(4 * workers):
+            submit_next()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                submit_next()
+                yield future.result()
+
+
+def main(argv=None):
+    """Command line entry point. Prints one JSON line per finished game, then a summary. Returns the exit status."""
+    parser = argparse.ArgumentParser(description="Play ChessVar games between two players in parallel.")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--white', type=parse_player, default=parse_player('engine:depth=2'),
+                        help="'random', 'engine:depth=N[,time_limit=S]', or 'mcts:iterations=N[,time_limit=S]' "
+                             "(default engine:depth=2)")
+    parser.add_argument('--black', type=parse_player, default=parse_player('random'),
+                        help="same format as --white (default random)")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game; game n uses seed + n")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument('--max-turns', type=int, default=200, help="turns before a game is called a draw")
+    parser.add_argument('--opening-plies', type=int, default=4, help="random moves at the start of every game")
+    parser.add_argument('--quiet', action='store_true', help="only print the summary")
+    args = parser.parse_args(argv)
+
+    tally = {'white': 0, 'black': 0, None: 0}
+    start = time.perf_counter()
+    for result in run_tournament(args.games, args.white, args.black, args.seed, args.workers, args.max_turns,
+                                 args.opening_plies):
+        tally[result['winner']] += 1
+        if not args.quiet:
+            print(json.dumps(result), flush=True)
+    elapsed = time.perf_counter() - start
+    print(f"white {tally['white']}  black {tally['black']}  draws {tally[None]}  "
+          f"({args.games / elapsed:.1f} games/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,29 +6,200 @@
 #     checkmate, castling, en passant, or pawn promotion. Includes class ChessVar for the game and board and class Piece
 #     and inheriting classes for the pieces, along with required methods for each.
 
+import random
+import time
+from collections import OrderedDict
+
+# Squares are stored internally as integers 0-63, a1 = 0, b1 = 1, ... h8 = 63 (rank * 8 + file). Algebraic strings are
+# only converted at the make_move and print_board boundary.
+SQUARE_NAMES = tuple(file + rank for rank in '12345678' for file in 'abcdefgh')
+SQUARE_INDEX = {name: square for square, name in enumerate(SQUARE_NAMES)}
+
+
+def square_index(location):
+    """Returns the integer index of an algebraic square such as 'e4', or None if it is not a square on the board."""
+    return SQUARE_INDEX.get(location)
+
+
+def square_name(square):
+    """Returns the algebraic name of an integer square index."""
+    return SQUARE_NAMES[square]
+
+
+def _build_step_table(steps):
+    """Returns, for every square, a bitboard of the squares reachable by a single (rank, file) step that stays on the
+    board."""
+    table = []
+    for square in range(64):
+        rank, file = divmod(square, 8)
+        targets = 0
+        for rank_step, file_step in steps:
+            if 0 <= rank + rank_step <= 7 and 0 <= file + file_step <= 7:
+                targets |= 1 << (square + 8 * rank_step + file_step)
+        table.append(targets)
+    return tuple(table)
+
+
+def _build_ray_table(rank_step, file_step):
+    """Returns, for every square, a bitboard of the squares walked in one direction up to the edge of the board, not
+    including the square itself."""
+    table = []
+    for square in range(64):
+        rank, file = divmod(square, 8)
+        ray = 0
+        rank, file = rank + rank_step, file + file_step
+        while 0 <= rank <= 7 and 0 <= file <= 7:
+            ray |= 1 << (8 * rank + file)
+            rank, file = rank + rank_step, file + file_step
+        table.append(ray)
+    return tuple(table)
+
+
+# Bitboards are ints with bit n set when square n is in the set. Attack tables for the jumping pieces are precomputed
+# for every square; sliding pieces use precomputed rays, cut at the first blocker (classical ray scan).
+KING_ATTACKS = _build_step_table(((0, 1), (0, -1), (1, 0), (-1, 0), (1, 1), (-1, 1), (1, -1), (-1, -1)))
+KNIGHT_ATTACKS = _build_step_table(((1, 2), (-1, 2), (1, -2), (-1, -2), (2, 1), (-2, 1), (2, -1), (-2, -1)))
+PAWN_ATTACKS = {'white': _build_step_table(((1, 1), (1, -1))), 'black': _build_step_table(((-1, 1), (-1, -1)))}
+
+# Rays running towards higher square numbers are cut at their lowest blocker, the others at their highest.
+POSITIVE_ROOK_RAYS = (_build_ray_table(1, 0), _build_ray_table(0, 1))
+NEGATIVE_ROOK_RAYS = (_build_ray_table(-1, 0), _build_ray_table(0, -1))
+POSITIVE_BISHOP_RAYS = (_build_ray_table(1, 1), _build_ray_table(1, -1))
+NEGATIVE_BISHOP_RAYS = (_build_ray_table(-1, -1), _build_ray_table(-1, 1))
+# For every square, the squares sharing a rank, file, or diagonal with it: the only places a slider reaching it can be.
+LINES_THROUGH = tuple(sum(rays[square] for rays in POSITIVE_ROOK_RAYS + NEGATIVE_ROOK_RAYS + POSITIVE_BISHOP_RAYS +
+                          NEGATIVE_BISHOP_RAYS) for square in range(64))
+
+
+def _slider_attacks(square, occupancy, positive_rays, negative_rays):
+    """Returns the bitboard of squares attacked along the given rays, up to and including the first occupied square in
+    each direction."""
+    attacks = 0
+    for rays in positive_rays:
+        ray = rays[square]
+        blockers = ray & occupancy
+        if blockers:
+            ray ^= rays[(blockers & -blockers).bit_length() - 1]
+        attacks |= ray
+    for rays in negative_rays:
+        ray = rays[square]
+        blockers = ray & occupancy
+        if blockers:
+            ray ^= rays[blockers.bit_length() - 1]
+        attacks |= ray
+    return attacks
+
+
+def rook_attacks(square, occupancy):
+    """Returns the bitboard of squares a rook on square attacks given the occupancy bitboard."""
+    return _slider_attacks(square, occupancy, POSITIVE_ROOK_RAYS, NEGATIVE_ROOK_RAYS)
+
+
+def bishop_attacks(square, occupancy):
+    """Returns the bitboard of squares a bishop on square attacks given the occupancy bitboard."""
+    return _slider_attacks(square, occupancy, POSITIVE_BISHOP_RAYS, NEGATIVE_BISHOP_RAYS)
+
+
+def queen_attacks(square, occupancy):
+    """Returns the bitboard of squares a queen on square attacks given the occupancy bitboard."""
+    return _slider_attacks(square, occupancy, POSITIVE_ROOK_RAYS, NEGATIVE_ROOK_RAYS) | \
+        _slider_attacks(square, occupancy, POSITIVE_BISHOP_RAYS, NEGATIVE_BISHOP_RAYS)
+
+
+def iter_squares(bitboard):
+    """Yields the square index of every set bit in a bitboard, lowest first."""
+    while bitboard:
+        low_bit = bitboard & -bitboard
+        yield low_bit.bit_length() - 1
+        bitboard ^= low_bit
+
+
+def _build_ray_towards_table():
+    """Returns, indexed by square * 64 + target, the (ray table, True if it runs towards higher squares) of the
+    direction leading from square to target, or None if they share no rank, file, or diagonal."""
+    table = [None] * 4096
+    for positive, ray_tables in ((True, POSITIVE_ROOK_RAYS + POSITIVE_BISHOP_RAYS),
+                                 (False, NEGATIVE_ROOK_RAYS + NEGATIVE_BISHOP_RAYS)):
+        for rays in ray_tables:
+            for square in range(64):
+                for target in iter_squares(rays[square]):
+                    table[square * 64 + target] = (rays, positive)
+    return tuple(table)
+
+
+# Lets a slider's attack map be brought up to date one direction at a time, see ChessVar._update_sliders_through.
+RAY_TOWARDS = _build_ray_towards_table()
+
+
+OPPONENT = {'white': 'black', 'black': 'white'}
+PIECE_NAMES = ('king', 'queen', 'bishop', 'knight', 'rook', 'pawn')
+SLIDER_NAMES = frozenset(('queen', 'bishop', 'rook'))
+PIECE_LETTERS = {'king': 'k', 'queen': 'q', 'bishop': 'b', 'knight': 'n', 'rook': 'r', 'pawn': 'p'}  # Upper case white.
+# Attacker counts are kept bit-sliced, see ChessVar._attack_counts. No square has more than 16 attackers of one color,
+# one along each of the 8 lines through it and one on each of the 8 knight squares, so 5 binary digits are enough.
+ATTACK_COUNT_DIGITS = 5
+CHECKPOINT_INTERVAL = 32  # Default plies between history checkpoints, see set_checkpoint_interval.
+# Why an instrumented make_move returned False, in the order the checks are made. A from square that is not a square
+# counts as empty, and a to square that is not a square as out of range.
+REJECTION_REASONS = ('game_over', 'empty_square', 'wrong_player', 'out_of_range')
+
+
+def _build_zobrist_keys(seed=0x5EED):
+    """Returns {(color, name): tuple of a random 64-bit key per square} and the key for black to move. Seeded, so
+    keys and position hashes are the same in every process."""
+    generator = random.Random(seed)
+    keys = {(color, name): tuple(generator.getrandbits(64) for _ in range(64))
+            for color in ('white', 'black') for name in PIECE_NAMES}
+    return keys, generator.getrandbits(64)
+
+
+# A position's hash is the XOR of the keys of every (color, name, square) on the board, plus the side key when black
+# is to move. ChessVar updates it incrementally as pieces are placed and removed.
+ZOBRIST_KEYS, ZOBRIST_BLACK_TO_MOVE = _build_zobrist_keys()
+
+_START_POSITION = None  # Set once ChessVar and the pieces are defined, see the end of the module.
+
+
 class ChessVar:
     """Represents a variant chess game. Monitors game state, turns, active player, pieces in play, and occupied squares.
     Includes a get method for game state, a get method for game turn, a method for players to make moves and a method to
     print the board. Communicates with different Pieces to assess legality of moves."""
 
     def __init__(self):
+        if _START_POSITION is not None:
+            self._copy_from(_START_POSITION)
+            # self.print_board()  # Uncomment to print board at game start.
+            return
+        # Only reached once, building _START_POSITION itself at import; every game after that takes the branch above.
         self._game_state = 'UNFINISHED'  # 'UNFINISHED', 'WHITE_WON', or 'BLACK_WON'
         self._turn = 0  # Increments at game start and end of every 'black' player phase.
         self._active_player = 'white'  # 'white' or 'black'
         self._white_pieces = {'king': 1, 'queen': 1, 'bishop': 2, 'knight': 2, 'rook': 2, 'pawn': 8}
         self._black_pieces = {'king': 1, 'queen': 1, 'bishop': 2, 'knight': 2, 'rook': 2, 'pawn': 8}
-        self._occupied_squares = {'e1': King('white'), 'd1': Queen('white'), 'c1': Bishop('white'),
-                                  'f1': Bishop('white'), 'b1': Knight('white'), 'g1': Knight('white'),
-                                  'a1': Rook('white'), 'h1': Rook('white'), 'a2': Pawn('a2', 'white'),
-                                  'b2': Pawn('b2', 'white'), 'c2': Pawn('c2', 'white'), 'd2': Pawn('d2', 'white'),
-                                  'e2': Pawn('e2', 'white'), 'f2': Pawn('f2', 'white'), 'g2': Pawn('g2', 'white'),
-                                  'h2': Pawn('h2', 'white'), 'e8': King('black'), 'd8': Queen('black'),
-                                  'c8': Bishop('black'), 'f8': Bishop('black'), 'b8': Knight('black'),
-                                  'g8': Knight('black'), 'a8': Rook('black'), 'h8': Rook('black'),
-                                  'a7': Pawn('a7', 'black'), 'b7': Pawn('b7', 'black'), 'c7': Pawn('c7', 'black'),
-                                  'd7': Pawn('d7', 'black'), 'e7': Pawn('e7', 'black'), 'f7': Pawn('f7', 'black'),
-                                  'g7': Pawn('g7', 'black'), 'h7': Pawn('h7', 'black')}  # {'square': class(Piece)}
-        # self.print_board()  # Uncomment to print board at game start.
+        self._board = [None] * 64  # [Piece or None], indexed by square 0-63.
+        self._piece_bitboards = {'white': dict.fromkeys(self._white_pieces, 0),
+                                 'black': dict.fromkeys(self._black_pieces, 0)}  # {color: {name: bitboard}}
+        self._color_bitboards = {'white': 0, 'black': 0}  # {color: bitboard of all that color's pieces}
+        self._undo_stack = []  # [(from, to, captured Piece or None, prior game state, prior turn, prior player)]
+        self._redo_stack = []  # Undo stack records of moves taken back, the next move to step forward to last.
+        self._checkpoint_interval = CHECKPOINT_INTERVAL
+        self._checkpoints = []  # [snapshot of the position at ply n * interval, see _snapshot], while consecutive.
+        self._hash = 0  # Zobrist hash of the position, see ZOBRIST_KEYS.
+        self._attacks = [0] * 64  # [bitboard attacked by the piece on each square, 0 if empty]
+        # {color: [bitboard of the squares whose count of that color's attackers has binary digit n set]}, so a whole
+        # attack map is added to or taken from the counts with a few carries rather than a step per square.
+        self._attack_counts = {'white': [0] * ATTACK_COUNT_DIGITS, 'black': [0] * ATTACK_COUNT_DIGITS}
+        self._sliders = 0  # Bitboard of every queen, bishop, and rook, whose attacks depend on other pieces.
+        self._stale = 0  # Bitboard of squares changed since the attack maps were refreshed, see _refresh_attacks.
+        self._last_pieces = {'white': 0, 'black': 0}  # {color: bitboard of its pieces that are the last of their type}
+        self._stats = None  # Instrumentation counters, see enable_instrumentation, or None.
+        self._listener = None  # Instrumentation callback or None.
+        for color, back_rank, pawn_rank in (('white', 0, 1), ('black', 7, 6)):
+            for file, name in enumerate(('rook', 'knight', 'bishop', 'queen', 'king', 'bishop', 'knight', 'rook')):
+                self._put_piece(8 * back_rank + file, PIECES[(color, name)])
+                self._put_piece(8 * pawn_rank + file, PIECES[(color, 'pawn')])
+            for name in PIECE_NAMES:
+                self._update_last_pieces(color, name)
         self._turn += 1
 
     def get_game_state(self):
@@ -44,40 +215,729 @@ class ChessVar:
         """Attempts to move a piece from one square to another. If the game is over, the wrong player is moving, the
         starting square is empty, or the move is illegal for any reason, returns False. Otherwise, moves the piece,
         removes any captured piece, updates the game state, updates the turn, and returns True."""
-        if self._game_state == 'UNFINISHED' and move_from in self._occupied_squares and \
-                self._occupied_squares[move_from].get_color() == self._active_player and move_to in \
-                self._occupied_squares[move_from].move_range(move_from, self._occupied_squares):
-            if move_to in self._occupied_squares:
-                if self._active_player == 'white':
-                    self._black_pieces[self._occupied_squares[move_to].get_name()] -= 1
-                    if self._black_pieces[self._occupied_squares[move_to].get_name()] == 0:
-                        self._occupied_squares[move_to] = self._occupied_squares[move_from]
-                        del self._occupied_squares[move_from]
-                        self._game_state = 'WHITE_WON'
-                        # self.print_board()    # Uncomment to print board after move.
-                        return True
-                else:
-                    self._white_pieces[self._occupied_squares[move_to].get_name()] -= 1
-                    if self._white_pieces[self._occupied_squares[move_to].get_name()] == 0:
-                        self._occupied_squares[move_to] = self._occupied_squares[move_from]
-                        del self._occupied_squares[move_from]
-                        self._game_state = 'BLACK_WON'
-                        # self.print_board()    # Uncomment to print board after move.
-                        return True
-            self._occupied_squares[move_to] = self._occupied_squares[move_from]
-            del self._occupied_squares[move_from]
-            # self.print_board()    # Uncomment to print board after move.
-            if self._active_player == 'black':
-                self._active_player = 'white'
-                self._turn += 1
+        if self._stats is not None:
+            return self._instrumented_make_move(move_from, move_to)
+        from_square = SQUARE_INDEX.get(move_from)
+        to_square = SQUARE_INDEX.get(move_to)
+        if from_square is None or to_square is None:
+            return False
+        return self._make_square_move(from_square, to_square)
+
+    def _make_square_move(self, from_square, to_square):
+        """Integer-square version of make_move. Takes two square indexes 0-63 and returns True or False exactly as
+        make_move does."""
+        piece = self._board[from_square]
+        if self._game_state != 'UNFINISHED' or piece is None or piece.get_color() != self._active_player or \
+                not self._range_mask(from_square) >> to_square & 1:
+            return False
+        self._record_history(from_square, to_square)
+        self._apply_move(from_square, to_square)
+        return True
+
+    def _record_history(self, from_square, to_square):
+        """Keeps the history in step with a move about to be made: takes a checkpoint if the ply is due one, and
+        either moves along the line of moves taken back, if this is its next move, or drops that line and the
+        checkpoints beyond this ply."""
+        ply = len(self._undo_stack)
+        if not ply % self._checkpoint_interval and len(self._checkpoints) == ply // self._checkpoint_interval:
+            self._checkpoints.append(self._snapshot())
+        if self._redo_stack:
+            if self._redo_stack[-1][0] == from_square and self._redo_stack[-1][1] == to_square:
+                self._redo_stack.pop()
             else:
-                self._active_player = 'black'
+                self._redo_stack = []
+                del self._checkpoints[ply // self._checkpoint_interval + 1:]
+
+    def make_moves(self, moves):
+        """Makes a sequence of moves, each a pair of algebraic squares, e.g. [('e2', 'e4'), ('e7', 'e5')], checking each
+        exactly as make_move does. Stops at the first move make_move would reject, including any move after the game
+        is won. Returns (index of the rejected move or None if every move was made, game state)."""
+        # Instrumented games, see enable_instrumentation, go through make_move so every move is counted.
+        if self._stats is not None:
+            for index, (move_from, move_to) in enumerate(moves):
+                if not self.make_move(move_from, move_to):
+                    return index, self._game_state
+            return None, self._game_state
+        square_index = SQUARE_INDEX.get
+        make_square_move = self._make_square_move
+        for index, (move_from, move_to) in enumerate(moves):
+            from_square = square_index(move_from)
+            to_square = square_index(move_to)
+            if from_square is None or to_square is None or not make_square_move(from_square, to_square):
+                return index, self._game_state
+        return None, self._game_state
+
+    def make_encoded_moves(self, text):
+        """Same as make_moves for moves written as one string of from and to squares, e.g. 'e2e4e7e5g1f3'. Whitespace
+        between moves is ignored, so 'e2e4 e7e5' and a move per line also work. A trailing partial move is rejected."""
+        text = ''.join(text.split())
+        return self.make_moves((text[index:index + 2], text[index + 2:index + 4]) for index in range(0, len(text), 4))
+
+    def push(self, move_from, move_to):
+        """Same as make_move. Paired with pop for walking a move tree on a single board."""
+        return self.make_move(move_from, move_to)
+
+    def pop(self):
+        """Takes back the last move made and returns it as a pair of algebraic squares. Raises IndexError if no move
+        has been made."""
+        if not self._undo_stack:
+            raise IndexError("pop from a game with no moves")
+        if self._stats is not None:
+            return self._instrumented_pop()
+        self._redo_stack.append(self._undo_stack[-1])
+        from_square, to_square = self._undo_move()
+        return SQUARE_NAMES[from_square], SQUARE_NAMES[to_square]
+
+    def unmake_move(self):
+        """Takes back the last move made, restoring the board, piece counts, game state, active player, and turn.
+        Returns False if no move has been made, otherwise True. The move is kept in the history, so step_forward can
+        make it again until a different move is made."""
+        if not self._undo_stack:
+            return False
+        if self._stats is not None:
+            self._instrumented_pop()
             return True
-        return False
+        self._redo_stack.append(self._undo_stack[-1])
+        self._undo_move()
+        return True
+
+    def step_back(self):
+        """Same as unmake_move. Paired with step_forward for moving through the game's history."""
+        return self.unmake_move()
+
+    def step_forward(self):
+        """Makes the next move of the history again after a step_back, unmake_move, pop, or seek. Returns False if
+        there is none, otherwise True. The move goes through make_move, so an instrumented game counts and reports it
+        like any other."""
+        if not self._redo_stack:
+            return False
+        return self.make_move(SQUARE_NAMES[self._redo_stack[-1][0]], SQUARE_NAMES[self._redo_stack[-1][1]])
+
+    def get_ply(self):
+        """Returns the number of moves made to reach the current position, its place in the history."""
+        return len(self._undo_stack)
+
+    def get_history_length(self):
+        """Returns the number of moves in the history: those made, plus those taken back that step_forward can make
+        again."""
+        return len(self._undo_stack) + len(self._redo_stack)
+
+    def seek(self, ply):
+        """Moves to the position after the first ply moves of the history. A nearby ply is reached with step_back and
+        step_forward, so an instrumented game reports each move. A distant ply is reached by restoring the nearest
+        checkpoint at or before it and replaying at most the checkpoint interval's worth of moves, which an
+        instrumented game reports as a single 'state' event once there. Raises IndexError if ply is not between 0 and
+        get_history_length()."""
+        if not 0 <= ply <= self.get_history_length():
+            raise IndexError("ply out of range: " + str(ply))
+        checkpoint = ply // self._checkpoint_interval
+        if abs(ply - len(self._undo_stack)) <= self._checkpoint_interval or checkpoint >= len(self._checkpoints):
+            while len(self._undo_stack) > ply:
+                self.step_back()
+            while len(self._undo_stack) < ply:
+                self.step_forward()
+            return
+        self._restore_checkpoint(checkpoint)
+        while len(self._undo_stack) < ply:
+            self._replay_forward()
+        if self._listener is not None:
+            self._listener(self, 'state', {'state': self._game_state})
+
+    def set_checkpoint_interval(self, plies):
+        """Sets the number of plies between history checkpoints (32 by default). Shorter intervals make seek faster
+        on long games and take more memory. Checkpoints for the history so far are retaken, which replays it once.
+        Raises ValueError if plies is less than 1."""
+        if plies < 1:
+            raise ValueError("checkpoint interval must be at least 1")
+        ply = len(self._undo_stack)
+        while self._undo_stack:
+            self._redo_stack.append(self._undo_stack[-1])
+            self._undo_move()
+        self._checkpoint_interval = plies
+        self._checkpoints = []
+        while len(self._undo_stack) < ply:
+            self._replay_forward()
+
+    def _replay_forward(self):
+        """step_forward without the legality check or instrumentation, for replaying the history internally. The
+        redo stack must not be empty."""
+        self._replay_move(self._redo_stack[-1][0], self._redo_stack[-1][1])
+
+    def _replay_move(self, from_square, to_square):
+        """Makes a move known to be legal, such as one read back from a game record, without checking it, keeping the
+        history and its checkpoints as _make_square_move does. Searches, which take their moves back, use _apply_move
+        instead."""
+        self._record_history(from_square, to_square)
+        self._apply_move(from_square, to_square)
+
+    def _snapshot(self):
+        """Returns a compact copy of the position for a checkpoint: (square codes, piece counts, turn, active
+        player), codes and counts as bytes in PIECE_CODES and PIECE_NAMES order. Taken only before a move is made, so
+        the game is always unfinished."""
+        return (bytes(map(PIECE_CODES.__getitem__, self._board)),
+                bytes([self._white_pieces[name] for name in PIECE_NAMES] +
+                      [self._black_pieces[name] for name in PIECE_NAMES]),
+                self._turn, self._active_player)
+
+    def _restore_checkpoint(self, checkpoint):
+        """Sets the position to checkpoint number checkpoint, moving the undo records of the moves after it onto the
+        redo stack. Only squares that differ are changed."""
+        ply = checkpoint * self._checkpoint_interval
+        codes, counts, self._turn, active_player = self._checkpoints[checkpoint]
+        line = self._undo_stack + self._redo_stack[::-1]
+        self._undo_stack = line[:ply]
+        self._redo_stack = line[ply:][::-1]
+        for square, code in enumerate(codes):
+            piece = PIECES_BY_CODE[code]
+            if self._board[square] is not piece:
+                if self._board[square] is not None:
+                    self._remove_piece(square)
+                if piece is not None:
+                    self._put_piece(square, piece)
+        self._white_pieces = dict(zip(PIECE_NAMES, counts[:6]))
+        self._black_pieces = dict(zip(PIECE_NAMES, counts[6:]))
+        self._game_state = 'UNFINISHED'
+        if active_player != self._active_player:
+            self._active_player = active_player
+            self._hash ^= ZOBRIST_BLACK_TO_MOVE
+        self._last_pieces = {'white': 0, 'black': 0}
+        for color in ('white', 'black'):
+            for name in PIECE_NAMES:
+                self._update_last_pieces(color, name)
+
+    def _apply_move(self, from_square, to_square):
+        """Moves the piece on from_square to to_square without checking legality, removes any captured piece, and
+        updates the game state, active player, and turn. Records what is needed to take the move back."""
+        captured = self._board[to_square]
+        self._undo_stack.append((from_square, to_square, captured, self._game_state, self._turn, self._active_player))
+        self._relocate(from_square, to_square, None)
+        if self._last_pieces[self._active_player] >> from_square & 1:
+            self._last_pieces[self._active_player] ^= 1 << from_square | 1 << to_square
+        if captured is not None:
+            self._last_pieces[captured.get_color()] &= ~(1 << to_square)
+            if self._active_player == 'white':
+                self._black_pieces[captured.get_name()] -= 1
+                self._update_last_pieces('black', captured.get_name())
+                if self._black_pieces[captured.get_name()] == 0:
+                    self._game_state = 'WHITE_WON'
+                    # self.print_board()    # Uncomment to print board after move.
+                    return
+            else:
+                self._white_pieces[captured.get_name()] -= 1
+                self._update_last_pieces('white', captured.get_name())
+                if self._white_pieces[captured.get_name()] == 0:
+                    self._game_state = 'BLACK_WON'
+                    # self.print_board()    # Uncomment to print board after move.
+                    return
+        # self.print_board()    # Uncomment to print board after move.
+        if self._active_player == 'black':
+            self._active_player = 'white'
+            self._turn += 1
+        else:
+            self._active_player = 'black'
+        self._hash ^= ZOBRIST_BLACK_TO_MOVE
+
+    def _undo_move(self):
+        """Takes back the move on top of the undo stack and returns its (from_square, to_square)."""
+        active_player = self._active_player
+        from_square, to_square, captured, self._game_state, self._turn, self._active_player = self._undo_stack.pop()
+        if self._active_player != active_player:
+            self._hash ^= ZOBRIST_BLACK_TO_MOVE
+        self._relocate(to_square, from_square, captured)
+        if self._last_pieces[self._active_player] >> to_square & 1:
+            self._last_pieces[self._active_player] ^= 1 << from_square | 1 << to_square
+        if captured is not None:
+            if captured.get_color() == 'white':
+                self._white_pieces[captured.get_name()] += 1
+            else:
+                self._black_pieces[captured.get_name()] += 1
+            self._update_last_pieces(captured.get_color(), captured.get_name())
+        return from_square, to_square
+
+    def _update_last_pieces(self, color, name):
+        """Marks color's pieces of type name in _last_pieces if exactly one is left, and unmarks them otherwise. Called
+        whenever that type's count changes; moves carry the mark along themselves."""
+        counts = self._white_pieces if color == 'white' else self._black_pieces
+        if counts[name] == 1:
+            self._last_pieces[color] |= self._piece_bitboards[color][name]
+        else:
+            self._last_pieces[color] &= ~self._piece_bitboards[color][name]
+
+    def enable_instrumentation(self, listener=None):
+        """Starts counting this game's make_move calls and timings, accepted and rejected by reason, range lookups by
+        piece type, and captures by piece type, from zero; see get_stats. If listener is given, it is called as
+        listener(game, event, details) after every make_move and take-back:
+            'move'      details {'from', 'to', 'piece', 'captured'}, captured a piece name or None
+            'rejected'  details {'from', 'to', 'reason'}, reason one of REJECTION_REASONS
+            'unmake'    details {'from', 'to'}
+            'state'     details {'state'}, after any of the above changes the game state, and after seek jumps to a
+                        checkpoint, which makes and takes back moves without reporting them one by one
+        Range lookups are counted for make_move and for move generation (legal_moves and the like). make_move,
+        unmake_move, pop, and move generation hand over to their counted versions while _stats is set, so games
+        without instrumentation pay one test per call. Moves the engine makes while searching, and those a seek jump
+        or set_checkpoint_interval replays, are not counted. Copies of the game start uninstrumented."""
+        self._stats = {'make_move_calls': 0, 'accepted': 0, 'rejected': dict.fromkeys(REJECTION_REASONS, 0),
+                       'make_move_seconds': 0.0, 'range_calls': dict.fromkeys(PIECE_NAMES, 0),
+                       'captures': dict.fromkeys(PIECE_NAMES, 0), 'unmakes': 0}
+        self._listener = listener
+
+    def disable_instrumentation(self):
+        """Stops counting and reporting, and discards the counters, so read get_stats first if they are wanted."""
+        self._stats = None
+        self._listener = None
+
+    def get_stats(self):
+        """Returns a copy of the instrumentation counters as a dictionary of numbers and dictionaries of numbers, or
+        None if instrumentation is not enabled."""
+        if self._stats is None:
+            return None
+        return {key: dict(value) if isinstance(value, dict) else value for key, value in self._stats.items()}
+
+    def _instrumented_make_move(self, move_from, move_to):
+        """make_move, counted and timed, and reported to the listener."""
+        start = time.perf_counter()
+        stats = self._stats
+        stats['make_move_calls'] += 1
+        from_square = SQUARE_INDEX.get(move_from)
+        to_square = SQUARE_INDEX.get(move_to)
+        piece = None if from_square is None else self._board[from_square]
+        if self._game_state != 'UNFINISHED':
+            reason = 'game_over'
+        elif piece is None:
+            reason = 'empty_square'
+        elif piece.get_color() != self._active_player:
+            reason = 'wrong_player'
+        elif to_square is None:
+            reason = 'out_of_range'
+        else:
+            stats['range_calls'][piece.get_name()] += 1
+            reason = None if self._range_mask(from_square) >> to_square & 1 else 'out_of_range'
+        if reason is not None:
+            stats['rejected'][reason] += 1
+            stats['make_move_seconds'] += time.perf_counter() - start
+            if self._listener is not None:
+                self._listener(self, 'rejected', {'from': move_from, 'to': move_to, 'reason': reason})
+            return False
+
+        captured = self._board[to_square]
+        game_state = self._game_state
+        self._record_history(from_square, to_square)
+        self._apply_move(from_square, to_square)
+        stats['accepted'] += 1
+        if captured is not None:
+            stats['captures'][captured.get_name()] += 1
+        stats['make_move_seconds'] += time.perf_counter() - start
+        if self._listener is not None:
+            self._listener(self, 'move', {'from': move_from, 'to': move_to, 'piece': piece.get_name(),
+                                          'captured': None if captured is None else captured.get_name()})
+            if self._game_state != game_state:
+                self._listener(self, 'state', {'state': self._game_state})
+        return True
+
+    def _instrumented_pop(self):
+        """pop, counted and reported to the listener. There must be a move to take back."""
+        game_state = self._game_state
+        self._redo_stack.append(self._undo_stack[-1])
+        from_square, to_square = self._undo_move()
+        move = SQUARE_NAMES[from_square], SQUARE_NAMES[to_square]
+        self._stats['unmakes'] += 1
+        if self._listener is not None:
+            self._listener(self, 'unmake', {'from': move[0], 'to': move[1]})
+            if self._game_state != game_state:
+                self._listener(self, 'state', {'state': self._game_state})
+        return move
+
+    def best_move(self, depth=4, time_limit=None, tablebase=None):
+        """Returns the engine's choice of move for the active player as a pair of algebraic squares, or None if the game
+        is over. Searches depth plies, stopping early after time_limit seconds if given. A ChessTablebase.Tablebase,
+        if given, answers the positions it covers outright."""
+        return self.analyze(depth, time_limit, tablebase).get_move()
+
+    def analyze(self, depth=4, time_limit=None, tablebase=None):
+        """Searches the position like best_move and returns the full ChessEngine.SearchResult: move, score, depth,
+        nodes, nodes per second, and principal variation."""
+        from ChessEngine import Engine  # Imported here because ChessEngine imports this module.
+        # An instrumented game is searched through an uninstrumented copy, keeping the search out of its counters.
+        return Engine(tablebase=tablebase).search(self if self._stats is None else self._copy(), depth, time_limit)
+
+    def get_moves(self):
+        """Returns the moves made so far as a list of pairs of algebraic squares, oldest first."""
+        return [(SQUARE_NAMES[record[0]], SQUARE_NAMES[record[1]]) for record in self._undo_stack]
+
+    def get_position(self):
+        """Returns the position as a text string: the board from rank 8 down to rank 1 in FEN style, upper case for
+        white and lower case for black, then 'w' or 'b' for the active player, then the turn number. The start position
+        is 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w 1'."""
+        ranks = []
+        for rank in range(7, -1, -1):
+            text = ''
+            empty = 0
+            for square in range(8 * rank, 8 * rank + 8):
+                piece = self._board[square]
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                letter = PIECE_LETTERS[piece.get_name()]
+                text += letter.upper() if piece.get_color() == 'white' else letter
+            ranks.append(text + (str(empty) if empty else ''))
+        return '/'.join(ranks) + ' ' + self._active_player[0] + ' ' + str(self._turn)
+
+    @classmethod
+    def from_position(cls, position, absent_types_lose=True):
+        """Returns a new game set up from a get_position string. Piece counts follow from the pieces on the board, and
+        a side missing every piece of some type has lost. The new game has no moves to take back. Raises ValueError if
+        the string is malformed.
+
+        With absent_types_lose False, a type a side has no pieces of is out of play instead: its count is set to one,
+        which no capture can bring to zero, so only the types on the board decide the game. This sets up the small
+        endgames of ChessTablebase, which the full rules never reach."""
+        fields = position.split()
+        ranks = fields[0].split('/') if fields else []
+        if len(fields) != 3 or len(ranks) != 8 or fields[1] not in ('w', 'b') or not fields[2].isdigit():
+            raise ValueError("malformed position: " + repr(position))
+        pieces = {}
+        names = {letter: name for name, letter in PIECE_LETTERS.items()}
+        for rank, text in zip(range(7, -1, -1), ranks):
+            file = 0
+            for character in text:
+                if character.isdigit():
+                    file += int(character)
+                    continue
+                if character.lower() not in PIECE_LETTERS.values() or file > 7:
+                    raise ValueError("malformed position: " + repr(position))
+                color = 'white' if character.isupper() else 'black'
+                pieces[8 * rank + file] = PIECES[(color, names[character.lower()])]
+                file += 1
+            if file != 8:
+                raise ValueError("malformed position: " + repr(position))
+
+        game = cls()
+        for square in range(64):
+            if game._board[square] is not None:
+                game._remove_piece(square)
+        for square, piece in pieces.items():
+            game._put_piece(square, piece)
+        game._white_pieces = dict.fromkeys(PIECE_NAMES, 0)
+        game._black_pieces = dict.fromkeys(PIECE_NAMES, 0)
+        for piece in pieces.values():
+            if piece.get_color() == 'white':
+                game._white_pieces[piece.get_name()] += 1
+            else:
+                game._black_pieces[piece.get_name()] += 1
+        if not absent_types_lose:
+            for counts in (game._white_pieces, game._black_pieces):
+                for name in PIECE_NAMES:
+                    counts[name] = counts[name] or 1
+        game._last_pieces = {'white': 0, 'black': 0}
+        for color in ('white', 'black'):
+            for name in PIECE_NAMES:
+                game._update_last_pieces(color, name)
+        if 0 in game._white_pieces.values():
+            game._game_state = 'BLACK_WON'
+        elif 0 in game._black_pieces.values():
+            game._game_state = 'WHITE_WON'
+        if fields[1] == 'b':
+            game._active_player = 'black'
+            game._hash ^= ZOBRIST_BLACK_TO_MOVE
+        game._turn = int(fields[2])
+        return game
+
+    def get_hash(self):
+        """Returns the 64-bit Zobrist hash of the position: pieces on squares and the side to move. Positions reached
+        by different move orders have the same hash."""
+        return self._hash
+
+    def is_attacked(self, square, by_color):
+        """Returns True if any of by_color's pieces attack the algebraic square, e.g. is_attacked('e4', 'black'). A
+        square is attacked if a piece could capture on it were an opposing piece there, so pieces of the same color
+        defend each other."""
+        return self._attacked_squares(by_color) >> SQUARE_INDEX[square] & 1 == 1
+
+    def attack_count(self, square, by_color):
+        """Returns how many of by_color's pieces attack the algebraic square."""
+        square = SQUARE_INDEX[square]
+        if self._stale:
+            self._refresh_attacks()
+        return sum((digit >> square & 1) << place for place, digit in enumerate(self._attack_counts[by_color]))
+
+    def attackers_of(self, square, by_color=None):
+        """Returns the list of algebraic squares holding pieces that attack square, of by_color only if given."""
+        bit = 1 << SQUARE_INDEX[square]
+        if self._stale:
+            self._refresh_attacks()
+        if by_color is None:
+            pieces = self._color_bitboards['white'] | self._color_bitboards['black']
+        else:
+            pieces = self._color_bitboards[by_color]
+        return [SQUARE_NAMES[attacker] for attacker in iter_squares(pieces) if self._attacks[attacker] & bit]
+
+    def threatened_types(self, color):
+        """Returns the names of color's piece types that are down to their last piece with that piece attacked by the
+        opponent, e.g. ['queen']. Any of them captured loses color the game."""
+        return [self._board[square].get_name()
+                for square in iter_squares(self._last_pieces[color] & self._attacked_squares(OPPONENT[color]))]
+
+    def winning_captures(self):
+        """Returns every move that wins the game on the spot for the active player, capturing the last piece of one of
+        the opponent's types, as pairs of algebraic squares. Returns an empty list once the game is over."""
+        if self._game_state != 'UNFINISHED':
+            return []
+        color = self._active_player
+        if self._stale:
+            self._refresh_attacks()
+        captures = []
+        for target in iter_squares(self._last_pieces[OPPONENT[color]] & self._attacked_squares(color)):
+            bit = 1 << target
+            captures.extend((SQUARE_NAMES[attacker], SQUARE_NAMES[target])
+                            for attacker in iter_squares(self._color_bitboards[color])
+                            if self._attacks[attacker] & bit)
+        return captures
+
+    def _has_winning_capture(self):
+        """Returns True if the active player can capture the last piece of one of the opponent's types, without
+        listing the moves. Only meaningful while the game is unfinished."""
+        return self._last_pieces[OPPONENT[self._active_player]] & self._attacked_squares(self._active_player) != 0
+
+    def _attacked_squares(self, color):
+        """Returns the bitboard of squares attacked by at least one of color's pieces: those with any of the
+        ATTACK_COUNT_DIGITS digits of their count set."""
+        if self._stale:
+            self._refresh_attacks()
+        digits = self._attack_counts[color]
+        return digits[0] | digits[1] | digits[2] | digits[3] | digits[4]
+
+    def legal_moves(self):
+        """Yields every legal move for the active player as a pair of algebraic squares, e.g. ('e2', 'e4'). Yields
+        nothing once the game is over."""
+        for from_square, to_square in self._square_moves():
+            yield SQUARE_NAMES[from_square], SQUARE_NAMES[to_square]
+
+    def _square_moves(self):
+        """Returns a list of every legal move for the active player as (from_square, to_square) index pairs."""
+        moves = []
+        if self._game_state != 'UNFINISHED':
+            return moves
+        if self._stats is not None:
+            for from_square in iter_squares(self._color_bitboards[self._active_player]):
+                self._stats['range_calls'][self._board[from_square].get_name()] += 1
+        for from_square in iter_squares(self._color_bitboards[self._active_player]):
+            for to_square in iter_squares(self._range_mask(from_square)):
+                moves.append((from_square, to_square))
+        return moves
+
+    def perft(self, depth):
+        """Returns the number of leaf positions exactly depth moves from the current position. A finished game is a
+        leaf with no moves below it. Used to check move generation against stored reference counts."""
+        moves = self._square_moves()
+        if depth <= 1:
+            return len(moves) if depth == 1 else 1
+        nodes = 0
+        for from_square, to_square in moves:
+            self._apply_move(from_square, to_square)
+            nodes += self.perft(depth - 1)
+            self._undo_move()
+        return nodes
+
+    def divide(self, depth):
+        """Returns a dictionary of {('from', 'to'): perft count below that move} for every legal move, for finding
+        which move a perft mismatch is under."""
+        counts = {}
+        for from_square, to_square in self._square_moves():
+            self._apply_move(from_square, to_square)
+            counts[(SQUARE_NAMES[from_square], SQUARE_NAMES[to_square])] = self.perft(depth - 1)
+            self._undo_move()
+        return counts
+
+    def _copy(self):
+        """Returns an independent copy of the game, including its undo stack. Pieces are shared, since nothing changes
+        them once placed."""
+        game = ChessVar.__new__(ChessVar)
+        game._copy_from(self)
+        return game
+
+    def _copy_from(self, other):
+        """Sets every member to a copy of other's."""
+        self._game_state = other._game_state
+        self._turn = other._turn
+        self._active_player = other._active_player
+        self._white_pieces = dict(other._white_pieces)
+        self._black_pieces = dict(other._black_pieces)
+        self._board = other._board[:]
+        self._piece_bitboards = {color: dict(bitboards) for color, bitboards in other._piece_bitboards.items()}
+        self._color_bitboards = dict(other._color_bitboards)
+        self._undo_stack = other._undo_stack[:]
+        self._redo_stack = other._redo_stack[:]
+        self._checkpoint_interval = other._checkpoint_interval
+        self._checkpoints = other._checkpoints[:]
+        self._hash = other._hash
+        self._attacks = other._attacks[:]
+        self._attack_counts = {color: counts[:] for color, counts in other._attack_counts.items()}
+        self._sliders = other._sliders
+        self._stale = other._stale
+        self._last_pieces = dict(other._last_pieces)
+        self._stats = None
+        self._listener = None
+
+    def _range_mask(self, square):
+        """Returns the bitboard of squares the piece on square may move to. Except for pawns, which move differently
+        than they capture, that is the stored attack map less squares holding pieces of the same color, while the maps
+        are up to date; otherwise the piece works its range out from the bitboards, which is cheaper than bringing
+        every map up to date for one lookup."""
+        piece = self._board[square]
+        color = piece.get_color()
+        if piece.get_name() != 'pawn' and not self._stale:
+            return self._attacks[square] & ~self._color_bitboards[color]
+        return piece.range_mask(square, self._color_bitboards[color], self._color_bitboards[OPPONENT[color]])
+
+    def _put_piece(self, square, piece):
+        """Places piece on an empty square, updating the board, bitboards, and hash, and marking the square's attack
+        map stale, see _refresh_attacks."""
+        bit = 1 << square
+        color = piece.get_color()
+        self._board[square] = piece
+        self._piece_bitboards[color][piece.get_name()] |= bit
+        self._color_bitboards[color] |= bit
+        self._hash ^= ZOBRIST_KEYS[(color, piece.get_name())][square]
+        if piece.get_name() in SLIDER_NAMES:
+            self._sliders |= bit
+        self._stale |= bit
+
+    def _remove_piece(self, square):
+        """Removes the piece on square, updating the board, bitboards, and hash, and marking the square's attack map
+        stale, and returns it."""
+        bit = 1 << square
+        piece = self._board[square]
+        color = piece.get_color()
+        self._board[square] = None
+        self._piece_bitboards[color][piece.get_name()] ^= bit
+        self._color_bitboards[color] ^= bit
+        self._hash ^= ZOBRIST_KEYS[(color, piece.get_name())][square]
+        if not self._stale & bit:
+            self._set_attacks(square, 0, color)
+        self._sliders &= ~bit
+        self._stale |= bit
+        return piece
+
+    def _relocate(self, from_square, to_square, left_behind):
+        """Moves the piece on from_square to to_square, removing any piece there, then places left_behind, a Piece or
+        None, on from_square. Does what _remove_piece and _put_piece would, as one change to the board."""
+        board = self._board
+        from_bit = 1 << from_square
+        to_bit = 1 << to_square
+        piece = board[from_square]
+        captured = board[to_square]
+        color = piece.get_color()
+        keys = ZOBRIST_KEYS[(color, piece.get_name())]
+        if not self._stale & from_bit:
+            self._set_attacks(from_square, 0, color)
+        board[from_square] = None
+        board[to_square] = piece
+        self._piece_bitboards[color][piece.get_name()] ^= from_bit | to_bit
+        self._color_bitboards[color] ^= from_bit | to_bit
+        self._hash ^= keys[from_square] ^ keys[to_square]
+        self._sliders &= ~(from_bit | to_bit)
+        if piece.get_name() in SLIDER_NAMES:
+            self._sliders |= to_bit
+        if captured is not None:
+            captured_color = captured.get_color()
+            self._piece_bitboards[captured_color][captured.get_name()] ^= to_bit
+            self._color_bitboards[captured_color] ^= to_bit
+            self._hash ^= ZOBRIST_KEYS[(captured_color, captured.get_name())][to_square]
+            if not self._stale & to_bit:
+                self._set_attacks(to_square, 0, captured_color)
+        if left_behind is not None:
+            left_color = left_behind.get_color()
+            board[from_square] = left_behind
+            self._piece_bitboards[left_color][left_behind.get_name()] |= from_bit
+            self._color_bitboards[left_color] |= from_bit
+            self._hash ^= ZOBRIST_KEYS[(left_color, left_behind.get_name())][from_square]
+            if left_behind.get_name() in SLIDER_NAMES:
+                self._sliders |= from_bit
+        self._stale |= from_bit | to_bit
+
+    def _refresh_attacks(self):
+        """Brings the attack maps and counts up to date with the board. Placing and removing pieces only marks their
+        squares stale, taking the attacks of the piece leaving a square out of the counts; the maps catch up here, when
+        something next needs them, for every square changed since. So a move and its take-back with nothing asked in
+        between, as in replaying a game or walking a move tree, cost no attack work, and a move with its replies costs
+        one refresh. The sliders whose rays reach a stale square are brought up to date first, then the pieces
+        standing on stale squares get their maps worked out afresh."""
+        stale = self._stale
+        self._stale = 0
+        occupancy = self._color_bitboards['white'] | self._color_bitboards['black']
+        lines = 0
+        squares = stale
+        while squares:
+            low_bit = squares & -squares
+            squares ^= low_bit
+            lines |= LINES_THROUGH[low_bit.bit_length() - 1]
+        self._update_sliders_through(stale, occupancy, lines)
+        board = self._board
+        squares = stale & occupancy
+        while squares:
+            low_bit = squares & -squares
+            squares ^= low_bit
+            square = low_bit.bit_length() - 1
+            piece = board[square]
+            self._set_attacks(square, piece.attacks(square, occupancy), piece.get_color())
+
+    def _set_attacks(self, square, attacks, color):
+        """Replaces the attack map stored for square, adjusting color's attacker counts only where it changed: one is
+        taken from every square it no longer attacks and added to every square it now does, for all those squares at
+        once, digit by digit, for as long as a borrow or carry is left."""
+        previous = self._attacks[square]
+        digits = self._attack_counts[color]
+        borrow = previous & ~attacks
+        place = 0
+        while borrow:
+            digit = digits[place]
+            digits[place] = digit ^ borrow
+            borrow &= ~digit
+            place += 1
+        carry = attacks & ~previous
+        place = 0
+        while carry:
+            digit = digits[place]
+            digits[place] = digit ^ carry
+            carry &= digit
+            place += 1
+        self._attacks[square] = attacks
+
+    def _update_sliders_through(self, bits, occupancy, lines):
+        """Brings up to date the attack maps of sliding pieces whose rays reach any square in bits, after pieces arrived
+        on or left them. Only these can change: the first square at which a ray differs must be on the ray as it was,
+        since the squares before it are as they were. Nor can the slider's other directions, so only the direction
+        leading to each such square is walked again. lines is a bitboard of the squares on lines through bits, see
+        LINES_THROUGH; sliders elsewhere are passed over without looking at their attack maps. Sliders on squares in
+        bits are left to the caller."""
+        attacks = self._attacks
+        sliders = self._sliders & lines
+        while sliders:
+            low_bit = sliders & -sliders
+            sliders ^= low_bit
+            slider = low_bit.bit_length() - 1
+            reached = attacks[slider] & bits
+            if not reached:
+                continue
+            slider_attacks = attacks[slider]
+            while reached:
+                target_bit = reached & -reached
+                reached ^= target_bit
+                rays, positive = RAY_TOWARDS[slider * 64 + target_bit.bit_length() - 1]
+                ray = rays[slider]
+                blockers = ray & occupancy
+                if blockers:
+                    ray ^= rays[(blockers & -blockers).bit_length() - 1 if positive else blockers.bit_length() - 1]
+                slider_attacks = slider_attacks & ~rays[slider] | ray
+            self._set_attacks(slider, slider_attacks, self._board[slider].get_color())
 
     def print_board(self):
         """Prints the board with labels for game state, turn, and rows and columns. Uncomment print_board calls in
-        __init__ and make_move to print board at game start and after each move."""
+        __init__ (where the start position is copied) and make_move to print board at game start and after each
+        move."""
 
         # Game state and turn labels.
         print("")
@@ -94,30 +954,62 @@ class ChessVar:
 
         # Print actual board.
         print("   a   b   c   d   e   f   g   h  ")
-        for row in range(8, 0, -1):
-            row_print = str(row) + " "
-            for column in range(ord('a'), ord('i')):
-                if chr(column) + str(row) not in self._occupied_squares:
+        for rank in range(7, -1, -1):
+            row_print = str(rank + 1) + " "
+            for square in range(8 * rank, 8 * rank + 8):
+                if self._board[square] is None:
                     row_print += " -- "
                 else:
-                    row_print += self._occupied_squares[(chr(column) + str(row))].get_symbol()
-            row_print += " " + str(row)
+                    row_print += self._board[square].get_symbol()
+            row_print += " " + str(rank + 1)
             print(row_print)
         print("   a   b   c   d   e   f   g   h  ")
 
 
+# Optional cache in front of Piece.move_range, off by default; see set_range_cache_size. Keyed on (name, color, square,
+# own pieces, enemy pieces), the piece bitboards cut down to the squares the piece could reach on an empty board (see
+# REACH_SQUARES), since nothing else can change its range. Shared by every game in the process.
+_range_cache = None  # OrderedDict of {key: frozenset of algebraic squares}, least recently used first, or None.
+_range_cache_size = 0
+_range_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def set_range_cache_size(size):
+    """Turns the move_range cache on with room for size entries, or off if size is 0. Either way the cache and its
+    statistics start empty. Raises ValueError if size is negative."""
+    global _range_cache, _range_cache_size
+    if size < 0:
+        raise ValueError("range cache size must not be negative: " + str(size))
+    _range_cache = OrderedDict() if size > 0 else None
+    _range_cache_size = size
+    for key in _range_cache_stats:
+        _range_cache_stats[key] = 0
+
+
+def get_range_cache_stats():
+    """Returns the move_range cache's capacity ('size'), current entries, hits, misses, evictions, and hit rate."""
+    lookups = _range_cache_stats['hits'] + _range_cache_stats['misses']
+    return {'size': _range_cache_size, 'entries': len(_range_cache) if _range_cache is not None else 0,
+            **_range_cache_stats, 'hit_rate': _range_cache_stats['hits'] / lookups if lookups else 0.0}
+
+
 class Piece:
     """Represents a chess piece with color and name. Communicates with ChessVar to get locations of particular pieces.
     Inheriting classes represent specific types of pieces with specific move ranges and methods to get those ranges.
-    Piece instances are never used; the class is only for inheritance. """
+    Piece instances are never used; the class is only for inheritance.
+
+    A piece holds nothing that changes during a game, so each (color, name) has a single shared instance in PIECES,
+    which every board uses. Pieces have no __dict__ and should be treated as immutable."""
+
+    __slots__ = ('_color', '_name', '_symbol')
 
     def __init__(self, color, name, symbol):
         self._color = color  # 'white' or 'black'
         self._name = name
         if color == 'white':
-            self._symbol = 'w' + symbol
+            self._symbol = ' w' + symbol
         else:
-            self._symbol = 'b' + symbol
+            self._symbol = ' b' + symbol
 
     def get_color(self):
         """Returns color."""
@@ -131,429 +1023,193 @@ class Piece:
         """Returns symbol."""
         return self._symbol
 
+    def __reduce__(self):
+        """Pickles a piece as its (color, name), so unpickling gives back the shared instance in PIECES."""
+        return _shared_piece, (self._color, self._name)
+
+    def __copy__(self):
+        """Returns the piece itself, as pieces are shared."""
+        return self
+
+    def __deepcopy__(self, memo):
+        """Returns the piece itself, so deep copies of boards keep holding the shared instances."""
+        return self
+
+    def move_range(self, location, occupied_squares):
+        """Takes an algebraic location and a dictionary of {'square': Piece} and returns the set of algebraic squares
+        in range. Kept for callers using algebraic notation; converts to and from range_mask."""
+        if _range_cache is not None:
+            return self._cached_move_range(SQUARE_INDEX[location], occupied_squares)
+        own = enemy = 0
+        for name, piece in occupied_squares.items():
+            if piece.get_color() == self._color:
+                own |= 1 << SQUARE_INDEX[name]
+            else:
+                enemy |= 1 << SQUARE_INDEX[name]
+        return {SQUARE_NAMES[square] for square in iter_squares(self.range_mask(SQUARE_INDEX[location], own, enemy))}
+
+    def _cached_move_range(self, square, occupied_squares):
+        """move_range through the range cache. Only the squares the piece can reach are looked up in occupied_squares,
+        so a hit costs a handful of dictionary lookups rather than a pass over every piece."""
+        own = enemy = 0
+        for bit, name in REACH_SQUARES[(self._color, self._name)][square]:
+            piece = occupied_squares.get(name)
+            if piece is not None:
+                if piece.get_color() == self._color:
+                    own |= bit
+                else:
+                    enemy |= bit
+        key = (self._name, self._color, square, own, enemy)
+        squares = _range_cache.get(key)
+        if squares is not None:
+            _range_cache_stats['hits'] += 1
+            _range_cache.move_to_end(key)
+            return set(squares)
+        _range_cache_stats['misses'] += 1
+        squares = frozenset(SQUARE_NAMES[target] for target in iter_squares(self.range_mask(square, own, enemy)))
+        _range_cache[key] = squares
+        if len(_range_cache) > _range_cache_size:
+            _range_cache.popitem(last=False)
+            _range_cache_stats['evictions'] += 1
+        return set(squares)
+
+    def range_mask(self, square, own, enemy):
+        """Takes a square and bitboards of same-color and opposing pieces, and returns the bitboard of squares in
+        range: every attacked square not holding a piece of the same color."""
+        return self.attacks(square, own | enemy) & ~own
+
 
 class King(Piece):
     """Represents a King, which may move one square in any direction."""
 
-    def __init__(self, color, name='king', symbol='K '):
-        super().__init__(color, name, symbol)
-        self._color = color  # 'white' or 'black'
-        self._name = name
-        if color == 'white':
-            self._symbol = ' w' + symbol
-        else:
-            self._symbol = ' b' + symbol
+    __slots__ = ()
 
-    def move_range(self, location, occupied_squares):
-        """Compares allowed move range with occupied squares and board dimensions to return set of moves in range."""
-        piece_range = set()
-
-        # Move right.
-        if ord('a') <= (ord(location[0])) + 1 <= ord('h'):
-            if chr((ord(location[0])) + 1) + location[1] not in occupied_squares \
-                    or occupied_squares[chr((ord(location[0])) + 1) + location[1]].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) + 1) + location[1])
-
-        # Move left.
-        if ord('a') <= (ord(location[0])) - 1 <= ord('h'):
-            if chr((ord(location[0])) - 1) + location[1] not in occupied_squares \
-                    or occupied_squares[chr((ord(location[0])) - 1) + location[1]].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) - 1) + location[1])
-
-        # Move up.
-        if 1 <= int(location[1]) + 1 <= 8:
-            if location[0] + str(int(location[1]) + 1) not in occupied_squares \
-                    or occupied_squares[location[0] + str(int(location[1]) + 1)].get_color() != self._color:
-                piece_range.add(location[0] + str(int(location[1]) + 1))
-
-        # Move down.
-        if 1 <= int(location[1]) - 1 <= 8:
-            if location[0] + str(int(location[1]) - 1) not in occupied_squares \
-                    or occupied_squares[location[0] + str(int(location[1]) - 1)].get_color() != self._color:
-                piece_range.add(location[0] + str(int(location[1]) - 1))
-
-        # Move right-up.
-        if ord('a') <= (ord(location[0])) + 1 <= ord('h') and 1 <= int(location[1]) + 1 <= 8:
-            if chr(ord(location[0]) + 1) + str(int(location[1]) + 1) not in occupied_squares \
-                    or occupied_squares[chr(ord(location[0]) + 1)
-                                        + str(int(location[1]) + 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) + 1) + str(int(location[1]) + 1))
-
-        # Move right-down.
-        if ord('a') <= (ord(location[0])) + 1 <= ord('h') and 1 <= int(location[1]) - 1 <= 8:
-            if chr(ord(location[0]) + 1) + str(int(location[1]) - 1) not in occupied_squares \
-                    or occupied_squares[chr(ord(location[0]) + 1)
-                                        + str(int(location[1]) - 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) + 1) + str(int(location[1]) - 1))
-
-        # Move left-up.
-        if ord('a') <= (ord(location[0])) - 1 <= ord('h') and 1 <= int(location[1]) + 1 <= 8:
-            if chr(ord(location[0]) - 1) + str(int(location[1]) + 1) not in occupied_squares \
-                    or occupied_squares[chr(ord(location[0]) - 1)
-                                        + str(int(location[1]) + 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) - 1) + str(int(location[1]) + 1))
-
-        # Move left-down.
-        if ord('a') <= (ord(location[0])) - 1 <= ord('h') and 1 <= int(location[1]) - 1 <= 8:
-            if chr(ord(location[0]) - 1) + str(int(location[1]) - 1) not in occupied_squares \
-                    or occupied_squares[chr(ord(location[0]) - 1)
-                                        + str(int(location[1]) - 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) - 1) + str(int(location[1]) - 1))
-
-        return piece_range
+    def __init__(self, color):
+        super().__init__(color, 'king', 'K ')
+
+    def attacks(self, square, occupancy):
+        """Returns the bitboard of squares attacked from square."""
+        return KING_ATTACKS[square]
 
 
 class Queen(Piece):
     """Represents a Queen, which may move any number of squares in any direction."""
 
-    def __init__(self, color, name='queen', symbol='Q '):
-        super().__init__(color, name, symbol)
-        self._color = color  # 'white' or 'black'
-        self._name = name
-        if color == 'white':
-            self._symbol = ' w' + symbol
-        else:
-            self._symbol = ' b' + symbol
+    __slots__ = ()
 
-    def move_range(self, location, occupied_squares):
-        """Compares allowed move range with occupied squares and board dimensions to return set of moves in range."""
-        piece_range = set()
-
-        # Moves right.
-        for square in range(ord(location[0]) + 1, ord('i')):
-            if ord('a') <= square <= ord('h'):
-                if chr(square) + location[1] in occupied_squares \
-                        and occupied_squares[chr(square) + location[1]].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + location[1])
-                if chr(square) + location[1] in occupied_squares:
-                    break
-
-        # Moves left.
-        for square in range(ord(location[0]) - 1, ord('a') - 1, - 1):
-            if ord('a') <= square <= ord('h'):
-                if chr(square) + location[1] in occupied_squares \
-                        and occupied_squares[chr(square) + location[1]].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + location[1])
-                if chr(square) + location[1] in occupied_squares:
-                    break
-
-        # Moves up.
-        for square in range(int(location[1]) + 1, 9):
-            if 1 <= square <= 8:
-                if location[0] + str(square) in occupied_squares \
-                        and occupied_squares[location[0] + str(square)].get_color() == self._color:
-                    break
-                piece_range.add(location[0] + str(square))
-                if location[0] + str(square) in occupied_squares:
-                    break
-
-        # Moves down.
-        for square in range(int(location[1]) - 1, 0, - 1):
-            if 1 <= square <= 8:
-                if location[0] + str(square) in occupied_squares \
-                        and occupied_squares[location[0] + str(square)].get_color() == self._color:
-                    break
-                piece_range.add(location[0] + str(square))
-                if location[0] + str(square) in occupied_squares:
-                    break
-
-        # Moves right-up.
-        for square in range(ord(location[0]) + 1, ord('i')):
-            if ord('a') <= square <= ord('h') and 1 <= int(location[1]) + square - ord(location[0]) <= 8:
-                if chr(square) + str(int(location[1]) + square - ord(location[0])) in occupied_squares \
-                        and occupied_squares[chr(square) + str(int(location[1]) + square -
-                                                               ord(location[0]))].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + str(int(location[1]) + square - ord(location[0])))
-                if chr(square) + str(int(location[1]) + square - ord(location[0])) in occupied_squares:
-                    break
-
-        # Moves right-down.
-        for square in range(ord(location[0]) + 1, ord('i')):
-            if ord('a') <= square <= ord('h') and 1 <= int(location[1]) - square + ord(location[0]) <= 8:
-                if chr(square) + str(int(location[1]) - square + ord(location[0])) in occupied_squares \
-                        and occupied_squares[chr(square) + str(int(location[1]) - square +
-                                                               ord(location[0]))].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + str(int(location[1]) - square + ord(location[0])))
-                if chr(square) + str(int(location[1]) - square + ord(location[0])) in occupied_squares:
-                    break
-
-        # Moves left-up.
-        for square in range(ord(location[0]) - 1, ord('a') - 1, - 1):
-            if ord('a') <= square <= ord('h') and 1 <= int(location[1]) + square - ord(location[0]) <= 8:
-                if chr(square) + str(int(location[1]) + square - ord(location[0])) in occupied_squares \
-                        and occupied_squares[chr(square) + str(int(location[1]) + square -
-                                                               ord(location[0]))].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + str(int(location[1]) + square - ord(location[0])))
-                if chr(square) + str(int(location[1]) + square - ord(location[0])) in occupied_squares:
-                    break
-
-        # Moves left-down.
-        for square in range(ord(location[0]) - 1, ord('a') - 1, - 1):
-            if ord('a') <= square <= ord('h') and 1 <= int(location[1]) - square + ord(location[0]) <= 8:
-                if chr(square) + str(int(location[1]) - square + ord(location[0])) in occupied_squares \
-                        and occupied_squares[chr(square) + str(int(location[1]) - square +
-                                                               ord(location[0]))].get_color() == self._color:
-                    break
-            piece_range.add(chr(square) + str(int(location[1]) - square + ord(location[0])))
-            if chr(square) + str(int(location[1]) - square + ord(location[0])) in occupied_squares:
-                break
-
-        return piece_range
+    def __init__(self, color):
+        super().__init__(color, 'queen', 'Q ')
+
+    def attacks(self, square, occupancy):
+        """Returns the bitboard of squares attacked from square."""
+        return queen_attacks(square, occupancy)
 
 
 class Bishop(Piece):
     """Represents a Bishop, which may move any number of squares diagonally."""
 
-    def __init__(self, color, name='bishop', symbol='B '):
-        super().__init__(color, name, symbol)
-        self._color = color  # 'white' or 'black'
-        self._name = name
-        if color == 'white':
-            self._symbol = ' w' + symbol
-        else:
-            self._symbol = ' b' + symbol
+    __slots__ = ()
 
-    def move_range(self, location, occupied_squares):
-        """Compares allowed move range with occupied squares and board dimensions to return set of moves in range."""
-        piece_range = set()
-
-        # Moves right-up.
-        for square in range(ord(location[0]) + 1, ord('i')):
-            if ord('a') <= square <= ord('h') and 1 <= int(location[1]) + square - ord(location[0]) <= 8:
-                if chr(square) + str(int(location[1]) + square - ord(location[0])) in occupied_squares \
-                        and occupied_squares[chr(square) + str(int(location[1]) + square -
-                                                               ord(location[0]))].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + str(int(location[1]) + square - ord(location[0])))
-                if chr(square) + str(int(location[1]) + square - ord(location[0])) in occupied_squares:
-                    break
-
-        # Moves right-down.
-        for square in range(ord(location[0]) + 1, ord('i')):
-            if ord('a') <= square <= ord('h') and 1 <= int(location[1]) - square + ord(location[0]) <= 8:
-                if chr(square) + str(int(location[1]) - square + ord(location[0])) in occupied_squares \
-                        and occupied_squares[chr(square) + str(int(location[1]) - square +
-                                                               ord(location[0]))].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + str(int(location[1]) - square + ord(location[0])))
-                if chr(square) + str(int(location[1]) - square + ord(location[0])) in occupied_squares:
-                    break
-
-        # Moves left-up.
-        for square in range(ord(location[0]) - 1, ord('a') - 1, - 1):
-            if ord('a') <= square <= ord('h') and 1 <= int(location[1]) + square - ord(location[0]) <= 8:
-                if chr(square) + str(int(location[1]) + square - ord(location[0])) in occupied_squares \
-                        and occupied_squares[chr(square) + str(int(location[1]) + square -
-                                                               ord(location[0]))].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + str(int(location[1]) + square - ord(location[0])))
-                if chr(square) + str(int(location[1]) + square - ord(location[0])) in occupied_squares:
-                    break
-
-        # Moves left-down.
-        for square in range(ord(location[0]) - 1, ord('a') - 1, - 1):
-            if ord('a') <= square <= ord('h') and 1 <= int(location[1]) - square + ord(location[0]) <= 8:
-                if chr(square) + str(int(location[1]) - square + ord(location[0])) in occupied_squares \
-                        and occupied_squares[chr(square) + str(int(location[1]) - square +
-                                                               ord(location[0]))].get_color() == self._color:
-                    break
-            piece_range.add(chr(square) + str(int(location[1]) - square + ord(location[0])))
-            if chr(square) + str(int(location[1]) - square + ord(location[0])) in occupied_squares:
-                break
-
-        return piece_range
+    def __init__(self, color):
+        super().__init__(color, 'bishop', 'B ')
+
+    def attacks(self, square, occupancy):
+        """Returns the bitboard of squares attacked from square."""
+        return bishop_attacks(square, occupancy)
 
 
 class Knight(Piece):
     """Represents a Knight, which may move two squares vertically and one horizontally, or two horizontally and one
     vertically."""
 
-    def __init__(self, color, name='knight', symbol='Kn'):
-        super().__init__(color, name, symbol)
-        self._color = color  # 'white' or 'black'
-        self._name = name
-        if color == 'white':
-            self._symbol = ' w' + symbol
-        else:
-            self._symbol = ' b' + symbol
+    __slots__ = ()
 
-    def move_range(self, location, occupied_squares):
-        """Compares allowed move range with occupied squares and board dimensions to return set of moves in range."""
-        piece_range = set()
-
-        # Move two right, one up.
-        if ord('a') <= (ord(location[0])) + 2 <= ord('h') and 1 <= int(location[1]) + 1 <= 8:
-            if chr(ord(location[0]) + 2) + str(int(location[1]) + 1) not in occupied_squares or \
-                    occupied_squares[chr(ord(location[0]) + 2) + str(int(location[1]) + 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) + 2) + str(int(location[1]) + 1))
-
-        # Move two right, one down.
-        if ord('a') <= (ord(location[0])) + 2 <= ord('h') and 1 <= int(location[1]) - 1 <= 8:
-            if chr(ord(location[0]) + 2) + str(int(location[1]) - 1) not in occupied_squares or \
-                    occupied_squares[chr(ord(location[0]) + 2) + str(int(location[1]) - 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) + 2) + str(int(location[1]) - 1))
-
-        # Move two left, one up.
-        if ord('a') <= (ord(location[0])) - 2 <= ord('h') and 1 <= int(location[1]) + 1 <= 8:
-            if chr(ord(location[0]) - 2) + str(int(location[1]) + 1) not in occupied_squares or \
-                    occupied_squares[chr(ord(location[0]) - 2) + str(int(location[1]) + 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) - 2) + str(int(location[1]) + 1))
-
-        # Move two left, one down.
-        if ord('a') <= (ord(location[0])) - 2 <= ord('h') and 1 <= int(location[1]) - 1 <= 8:
-            if chr(ord(location[0]) - 2) + str(int(location[1]) - 1) not in occupied_squares or \
-                    occupied_squares[chr(ord(location[0]) - 2) + str(int(location[1]) - 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) - 2) + str(int(location[1]) - 1))
-
-        # Move one right, two up.
-        if ord('a') <= (ord(location[0])) + 1 <= ord('h') and 1 <= int(location[1]) + 2 <= 8:
-            if chr(ord(location[0]) + 1) + str(int(location[1]) + 2) not in occupied_squares or \
-                    occupied_squares[chr(ord(location[0]) + 1) + str(int(location[1]) + 2)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) + 1) + str(int(location[1]) + 2))
-
-        # Move one right, two down.
-        if ord('a') <= (ord(location[0])) + 1 <= ord('h') and 1 <= int(location[1]) - 2 <= 8:
-            if chr(ord(location[0]) + 1) + str(int(location[1]) - 2) not in occupied_squares or \
-                    occupied_squares[chr(ord(location[0]) + 1) + str(int(location[1]) - 2)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) + 1) + str(int(location[1]) - 2))
-
-        # Move one left, two up.
-        if ord('a') <= (ord(location[0])) - 1 <= ord('h') and 1 <= int(location[1]) + 2 <= 8:
-            if chr(ord(location[0]) - 1) + str(int(location[1]) + 2) not in occupied_squares or \
-                    occupied_squares[chr(ord(location[0]) - 1) + str(int(location[1]) + 2)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) - 1) + str(int(location[1]) + 2))
-
-        # Move one left, two down.
-        if ord('a') <= (ord(location[0])) - 1 <= ord('h') and 1 <= int(location[1]) - 2 <= 8:
-            if chr(ord(location[0]) - 1) + str(int(location[1]) - 2) not in occupied_squares or \
-                    occupied_squares[chr(ord(location[0]) - 1) + str(int(location[1]) - 2)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) - 1) + str(int(location[1]) - 2))
-
-        return piece_range
+    def __init__(self, color):
+        super().__init__(color, 'knight', 'Kn')
+
+    def attacks(self, square, occupancy):
+        """Returns the bitboard of squares attacked from square."""
+        return KNIGHT_ATTACKS[square]
 
 
 class Rook(Piece):
     """Represents a Rook, which may move any number of squares vertically or horizontally."""
 
-    def __init__(self, color, name='rook', symbol='R '):
-        super().__init__(color, name, symbol)
-        self._color = color  # 'white' or 'black'
-        self._name = name
-        if color == 'white':
-            self._symbol = ' w' + symbol
-        else:
-            self._symbol = ' b' + symbol
+    __slots__ = ()
 
-    def move_range(self, location, occupied_squares):
-        """Compares allowed move range with occupied squares and board dimensions to return set of moves in range."""
-        piece_range = set()
-
-        # Moves right.
-        for square in range(ord(location[0]) + 1, ord('i')):
-            if ord('a') <= square <= ord('h'):
-                if chr(square) + location[1] in occupied_squares \
-                        and occupied_squares[chr(square) + location[1]].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + location[1])
-                if chr(square) + location[1] in occupied_squares:
-                    break
-
-        # Moves left.
-        for square in range(ord(location[0]) - 1, ord('a') - 1, - 1):
-            if ord('a') <= square <= ord('h'):
-                if chr(square) + location[1] in occupied_squares \
-                        and occupied_squares[chr(square) + location[1]].get_color() == self._color:
-                    break
-                piece_range.add(chr(square) + location[1])
-                if chr(square) + location[1] in occupied_squares:
-                    break
-
-        # Moves up.
-        for square in range(int(location[1]) + 1, 9):
-            if 1 <= square <= 8:
-                if location[0] + str(square) in occupied_squares \
-                        and occupied_squares[location[0] + str(square)].get_color() == self._color:
-                    break
-                piece_range.add(location[0] + str(square))
-                if location[0] + str(square) in occupied_squares:
-                    break
-
-        # Moves down.
-        for square in range(int(location[1]) - 1, 0, - 1):
-            if 1 <= square <= 8:
-                if location[0] + str(square) in occupied_squares \
-                        and occupied_squares[location[0] + str(square)].get_color() == self._color:
-                    break
-                piece_range.add(location[0] + str(square))
-                if location[0] + str(square) in occupied_squares:
-                    break
-
-        return piece_range
+    def __init__(self, color):
+        super().__init__(color, 'rook', 'R ')
+
+    def attacks(self, square, occupancy):
+        """Returns the bitboard of squares attacked from square."""
+        return rook_attacks(square, occupancy)
 
 
 class Pawn(Piece):
     """Represent a Pawn, which may move one square forward, or one diagonally to capture, or two forward on each
-    player's first turn."""
+    player's first turn.
 
-    def __init__(self, start_square, color, name='pawn', symbol='p '):
-        super().__init__(color, name, symbol)
-        self._start_square = start_square
-        self._color = color  # 'white' or 'black'
-        self._name = name
-        if color == 'white':
-            self._symbol = ' w' + symbol
-        else:
-            self._symbol = ' b' + symbol
+    Pawns never move backward or sideways, so a pawn still on its color's second rank has not moved yet. Its first-move
+    state therefore follows from the square it stands on, and one Pawn instance serves every pawn of its color."""
 
-    def move_range(self, location, occupied_squares):
-        """Compares allowed move range with occupied squares and board dimensions to return set of moves in range."""
-        piece_range = set()
-
-        # Move two forward on first move.
-        if location == self._start_square:
-            if self._color == 'white' and location[0] + str(int(location[1]) + 2) not in occupied_squares:
-                piece_range.add(location[0] + str(int(location[1]) + 2))
-            if self._color == 'black' and location[0] + str(int(location[1]) - 2) not in occupied_squares:
-                piece_range.add(location[0] + str(int(location[1]) - 2))
-
-        # Standard move forward for white.
-        if 1 <= int(location[1]) + 1 <= 8 and self._color == 'white' and location[0] + str(int(location[1]) + 1) \
-                not in occupied_squares:
-            piece_range.add(location[0] + str(int(location[1]) + 1))
-
-        # Standard move forward for black.
-        if 1 <= int(location[1]) - 1 <= 8 and self._color == 'black' and location[0] + str(int(location[1]) - 1) \
-                not in occupied_squares:
-            piece_range.add(location[0] + str(int(location[1]) - 1))
-
-        # Diagonal capture for white.
-        if self._color == 'white':
-            if chr(ord(location[0]) + 1) + str(int(location[1]) + 1) in occupied_squares and \
-                    occupied_squares[chr(ord(location[0]) + 1) + str(int(location[1]) + 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) + 1) + str(int(location[1]) + 1))
-            if chr(ord(location[0]) - 1) + str(int(location[1]) + 1) in occupied_squares and \
-                    occupied_squares[chr(ord(location[0]) - 1) + str(int(location[1]) + 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) - 1) + str(int(location[1]) + 1))
-
-        # Diagonal capture for black.
-        if self._color == 'black':
-            if chr(ord(location[0]) + 1) + str(int(location[1]) - 1) in occupied_squares and \
-                    occupied_squares[chr(ord(location[0]) + 1) + str(int(location[1]) - 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) + 1) + str(int(location[1]) - 1))
-            if chr(ord(location[0]) - 1) + str(int(location[1]) - 1) in occupied_squares and \
-                    occupied_squares[chr(ord(location[0]) - 1) + str(int(location[1]) - 1)].get_color() != self._color:
-                piece_range.add(chr(ord(location[0]) - 1) + str(int(location[1]) - 1))
-
-        return piece_range
-
-
-# It is possible for the Piece classes' respective move_range methods to ignore the color of the other pieces in their
-# range and let make_move rule out moves onto pieces of the same color. This could be done with a couple lines of code
-# in make_move; it would be more efficient and much easier to code. I have the move_range methods check color so that
-# the returned piece_range sets contain exclusively legal moves, which might make things easier on the as-yet unwritten
-# chess-playing program I think might be fun to experiment with.
+    __slots__ = ('_step', '_start_rank')
+
+    def __init__(self, color):
+        super().__init__(color, 'pawn', 'p ')
+        self._step = 8 if color == 'white' else -8
+        self._start_rank = 1 if color == 'white' else 6
+
+    def attacks(self, square, occupancy):
+        """Returns the bitboard of squares attacked (capturable) from square."""
+        return PAWN_ATTACKS[self._color][square]
+
+    def range_mask(self, square, own, enemy):
+        """Pawns move differently than they capture: forward onto empty squares, and diagonally only onto opposing
+        pieces."""
+        step = self._step
+
+        # Standard move forward, and two forward on first move if both squares are empty.
+        piece_range = 0
+        if 0 <= square + step <= 63 and not (own | enemy) >> (square + step) & 1:
+            piece_range = 1 << (square + step)
+            if square >> 3 == self._start_rank and not (own | enemy) >> (square + 2 * step) & 1:
+                piece_range |= 1 << (square + 2 * step)
+
+        # Diagonal capture.
+        return piece_range | PAWN_ATTACKS[self._color][square] & enemy
+
+
+# The shared piece instances, {(color, name): Piece}. Boards hold only these.
+PIECES = {}
+for _color in ('white', 'black'):
+    for _piece in (King(_color), Queen(_color), Bishop(_color), Knight(_color), Rook(_color), Pawn(_color)):
+        PIECES[(_color, _piece.get_name())] = _piece
+
+
+def _shared_piece(color, name):
+    """Returns the shared piece for (color, name). Used by Piece.__reduce__, so must stay at module level."""
+    return PIECES[(color, name)]
+
+
+# Piece codes for history checkpoints, as in ChessBatch: 0 an empty square, 1-6 white and 7-12 black pieces in
+# PIECE_NAMES order.
+PIECES_BY_CODE = (None,) + tuple(PIECES[(color, name)] for color in ('white', 'black') for name in PIECE_NAMES)
+PIECE_CODES = {piece: code for code, piece in enumerate(PIECES_BY_CODE)}
+# Side and type numbers of the piece codes, code = 1 + 6 * side + type, for the modules that work on codes.
+WHITE, BLACK = 0, 1
+KING, QUEEN, BISHOP, KNIGHT, ROOK, PAWN = range(6)  # PIECE_NAMES order.
+
+# {(color, name): [((bit, algebraic name) of each square the piece could reach from a square on an empty board)]}, the
+# only squares whose contents affect its range. Pawns reach both the squares they attack and those ahead of them.
+REACH_SQUARES = {key: [tuple((1 << target, SQUARE_NAMES[target]) for target in
+                             iter_squares(piece.attacks(square, 0) | piece.range_mask(square, 0, 0)))
+                       for square in range(64)] for key, piece in PIECES.items()}
+
+# The start position, set up once; every new ChessVar copies it rather than placing 32 pieces, attack maps included.
+_START_POSITION = ChessVar()
+_START_POSITION._refresh_attacks()
+
+# It is possible for the Piece classes' respective range methods to ignore the color of the other pieces in their range
+# and let make_move rule out moves onto pieces of the same color. This could be done with a couple lines of code in
+# make_move; it would be more efficient and much easier to code. I have the range methods check color so that the
+# returned bitboards contain exclusively legal moves, which the chess-playing program in ChessEngine.py relies on.